@@ -1,13 +1,31 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel, RootModel
-from typing import List, Dict, Any
+from fastapi import FastAPI, HTTPException, Request, Query
+from fastapi.responses import StreamingResponse, Response
+from pydantic import ValidationError
+from pydantic import BaseModel, Field, RootModel
+from typing import List, Dict, Any, Literal, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
+import asyncio
+import base64
+import numpy as np
+import orjson
 import uvicorn
 import sys
 import os
 
 from nlp_agent.nlp_agent import NLPAgent
+from nlp_agent.cache import EmbeddingCache
+from nlp_agent.vector_index import TodoVectorIndex
 from recommendation.todo_recommendation_system import LangChainTodoRecommendationSystem
+from recommendation.local_recommender import LocalTodoRecommender
+from recommendation.resilience import CircuitBreaker
+from recommendation.cache import (
+    RecommendationCache,
+    InMemoryCacheBackend,
+    SQLiteCacheBackend,
+    RedisCacheBackend,
+)
 
 # 새로운 요청 데이터 모델을 정의합니다.
 class PastTodoItem(BaseModel):
@@ -44,6 +62,20 @@ class RecommendationRequest(BaseModel):
 class TextRequest(BaseModel):
     user_id: str
     text: str
+    # True이면 추출한 할 일을 사용자 벡터 인덱스에 저장하고 응답에 index_id를 포함
+    index_todos: bool = False
+
+
+class BatchTextRequest(BaseModel):
+    items: List[TextRequest]
+
+
+class TodoSearchRequest(BaseModel):
+    user_id: str
+    text: str
+    k: int = Field(5, ge=1, le=100)
+    # 검색에서 제외할 인덱스 항목 ID (예: /process-text가 돌려준 방금 저장한 할 일의 index_id)
+    exclude_ids: List[int] = []
 
 
 # 새로운 응답 모델을 정의합니다.
@@ -52,10 +84,150 @@ class TodoResponse(BaseModel):
     todos: List[Dict[str, Any]]
 
 
+class ConcurrencyLimiter:
+    """
+    동시 실행 수와 대기열 길이를 제한합니다. 대기열이 가득 차면 즉시 503을 반환하여
+    한쪽 경로(예: 느린 OpenAI 호출)가 다른 경로를 굶기지 않도록 합니다.
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._admitted = 0
+
+    async def acquire(self):
+        """ 자리를 얻을 때까지 기다립니다. 대기열이 가득 차 있으면 503 HTTPException을 던집니다. """
+        if self._admitted >= self.max_concurrent + self.max_queue:
+            raise HTTPException(
+                status_code=503,
+                detail=f"{self.name} 요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해 주세요.",
+                headers={"Retry-After": "1"},
+            )
+        self._admitted += 1
+        try:
+            await self._semaphore.acquire()
+        except BaseException:
+            self._admitted -= 1
+            raise
+
+    def release(self):
+        self._semaphore.release()
+        self._admitted -= 1
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.release()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "admitted": self._admitted,
+        }
+
+
+# 임베딩/파싱 CPU 작업 전용 스레드 풀 (Starlette 기본 스레드 풀과 분리)
+NLP_EXECUTOR_WORKERS = int(os.getenv("NLP_EXECUTOR_WORKERS", str(os.cpu_count() or 4)))
+nlp_executor = ThreadPoolExecutor(max_workers=NLP_EXECUTOR_WORKERS, thread_name_prefix="nlp-worker")
+nlp_limiter = ConcurrencyLimiter(
+    "NLP",
+    max_concurrent=NLP_EXECUTOR_WORKERS,
+    max_queue=int(os.getenv("NLP_MAX_QUEUE", "64")),
+)
+recommendation_limiter = ConcurrencyLimiter(
+    "추천",
+    max_concurrent=int(os.getenv("RECOMMENDATION_MAX_CONCURRENT", "8")),
+    max_queue=int(os.getenv("RECOMMENDATION_MAX_QUEUE", "32")),
+)
+
+
 # NLPAgent와 추천 시스템 인스턴스를 초기화합니다.
-agent = NLPAgent()
+# 동시 요청의 임베딩을 묶는 마이크로 배처 설정 (환경 변수로 조정 가능)
+# 자주 반복되는 투두의 임베딩은 메모리 LRU + SQLite 캐시로 재사용합니다.
+EMBED_MODEL_NAME = "jhgan/ko-sroberta-multitask"
+# 임베딩 추론 백엔드: torch(fp32) / onnx / onnx-int8
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "torch")
+embedding_cache = EmbeddingCache(
+    model_name=EMBED_MODEL_NAME if EMBED_BACKEND == "torch" else f"{EMBED_MODEL_NAME}@{EMBED_BACKEND}",
+    max_entries=int(os.getenv("EMBED_CACHE_SIZE", "10000")),
+    db_path=os.getenv("EMBED_CACHE_PATH", ".cache/embeddings.sqlite3") or None,
+)
+agent = NLPAgent(
+    use_batcher=os.getenv("EMBED_BATCHING", "1") == "1",
+    max_batch_size=int(os.getenv("EMBED_BATCH_MAX_SIZE", "64")),
+    max_wait_ms=float(os.getenv("EMBED_BATCH_MAX_WAIT_MS", "5")),
+    embedding_cache=embedding_cache,
+    artifact_dir=os.getenv("CATEGORY_ARTIFACT_DIR", ".cache/artifacts") or None,
+    embed_backend=EMBED_BACKEND,
+    user_dictionary_dir=os.getenv("MECAB_USER_DIC_DIR") or None,
+    user_words_path=os.getenv("MECAB_USER_WORDS") or None,
+    categories_path=os.getenv("CATEGORY_CONFIG") or None,
+)
+
+
+# 사용자별 할 일 벡터 인덱스 (TODO_INDEX=flat|ivf 일 때만 사용). /process-text 결과의 임베딩을 저장해
+# 중복 할 일 감지와 유사 할 일 검색에 재사용합니다.
+TODO_INDEX_BACKEND = os.getenv("TODO_INDEX", "")
+TODO_DUPLICATE_THRESHOLD = float(os.getenv("TODO_DUPLICATE_THRESHOLD", "0.9"))
+todo_index = TodoVectorIndex(
+    index_dir=os.getenv("TODO_INDEX_DIR", ".cache/todo_index") or None,
+    backend=TODO_INDEX_BACKEND,
+    n_lists=int(os.getenv("TODO_INDEX_IVF_LISTS", "32")),
+    n_probe=int(os.getenv("TODO_INDEX_IVF_PROBE", "4")),
+) if TODO_INDEX_BACKEND else None
+
+
+def _build_recommendation_cache():
+    """ RECOMMENDATION_CACHE 환경 변수(memory/sqlite/redis/off)에 따라 추천 결과 캐시를 생성합니다. """
+    backend_name = os.getenv("RECOMMENDATION_CACHE", "memory")
+    max_entries = int(os.getenv("RECOMMENDATION_CACHE_SIZE", "1000"))
+    if backend_name == "off":
+        return None
+    if backend_name == "sqlite":
+        backend = SQLiteCacheBackend(
+            os.getenv("RECOMMENDATION_CACHE_PATH", ".cache/recommendations.sqlite3"), max_entries
+        )
+    elif backend_name == "redis":
+        backend = RedisCacheBackend(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+    else:
+        backend = InMemoryCacheBackend(max_entries)
+
+    # 임계값을 설정하면 같은 사용자/같은 오늘 일정 안에서 완료 기록이 거의 같은 결과도 재사용
+    # (할 일 텍스트를 각각 임베딩하므로 임베딩 캐시를 그대로 활용)
+    similarity = os.getenv("RECOMMENDATION_CACHE_SIMILARITY")
+    embed_fn = agent.embedder.embed_batch if similarity else None
+    return RecommendationCache(
+        backend,
+        ttl_seconds=float(os.getenv("RECOMMENDATION_CACHE_TTL", "3600")),
+        embed_fn=embed_fn,
+        similarity_threshold=float(similarity or 0.97),
+    )
+
+
 # 추천 시스템 인스턴스를 초기화합니다.
-recommendation_system = LangChainTodoRecommendationSystem()
+recommendation_cache = _build_recommendation_cache()
+recommendation_system = LangChainTodoRecommendationSystem(
+    cache=recommendation_cache,
+    # OpenAI 호출 실패 시, 또는 mode=local 요청 시 사용하는 임베딩 기반 로컬 추천기
+    local_recommender=LocalTodoRecommender(agent.embedder, agent.matcher),
+    # HISTORY_COMPRESSION=embedding이면 과거 기록 전체를 임베딩 기반으로 중복 제거/요약 (LLM 경로에서만 사용)
+    history_embed_fn=agent.embedder.embed_batch if os.getenv("HISTORY_COMPRESSION", "recent") == "embedding" else None,
+    # 오늘 일정과 겹치는 추천을 임베딩 유사도로 걸러내고 추가 후보/로컬 추천으로 보충
+    duplicate_embed_fn=agent.embedder.embed_batch,
+    duplicate_threshold=float(os.getenv("RECOMMENDATION_DUPLICATE_THRESHOLD", "0.85")),
+    # 프롬프트의 카테고리 목록을 매처 설정(CATEGORY_CONFIG)에서 가져와 분류 결과와 맞춤
+    categories=list(agent.matcher.categories),
+    max_concurrent_llm_calls=int(os.getenv("LLM_MAX_CONCURRENT", "4")),
+    circuit_breaker=CircuitBreaker(
+        failure_rate_threshold=float(os.getenv("LLM_BREAKER_FAILURE_RATE", "0.5")),
+        open_seconds=float(os.getenv("LLM_BREAKER_OPEN_SECONDS", "30")),
+    ),
+)
 
 
 # FastAPI 애플리케이션 인스턴스를 생성합니다.
@@ -66,42 +238,308 @@ app = FastAPI(
 )
 
 
+def warmup_for_fork():
+    """
+    멀티 프로세스 서빙(gunicorn.conf.py)에서 fork 전에 호출합니다.
+    지연 로딩되는 임베딩 모델을 마스터 프로세스에서 미리 로딩하여 워커들이 가중치를 공유하게 합니다.
+    ONNX 백엔드는 모델 파일만 준비하고, fork 이후 사용할 수 없는 추론 세션은 워커가 각자 만듭니다.
+    """
+    agent.embedder.load()
+    if agent.embedder.backend == "torch":
+        agent.embedder.embed_batch(["워밍업"])
+
+
 @app.get("/")
 def read_root():
     return {"message": "DoToDo NLP Model Service is running."}
 
 
+@app.get("/metrics/embedding")
+def embedding_metrics():
+    """
+    임베딩 마이크로 배처의 설정값과 큐 깊이/처리량, 임베딩 캐시 적중률, MeCab 사전 로딩 시간을 반환합니다.
+    """
+    metrics = {
+        "batching": agent.batcher is not None,
+        "cache": embedding_cache.stats(),
+        "tagger": agent.parser.tagger_provider.metrics(),
+        "limits": {"nlp": nlp_limiter.metrics(), "recommendation": recommendation_limiter.metrics()},
+        "recommendation_cache": recommendation_cache.stats() if recommendation_cache else None,
+        "llm": recommendation_system.llm_metrics(),
+        "todo_index": todo_index.stats() if todo_index else None,
+    }
+    if agent.batcher is not None:
+        metrics.update(agent.batcher.metrics())
+    return metrics
+
+
+# 임베딩 응답 형식: json(기본, 소수점 4자리 float 배열) / base64-f16 / base64-f32 (little-endian 바이트) / none(생략)
+EmbeddingFormat = Literal["json", "base64-f16", "base64-f32", "none"]
+MSGPACK_MEDIA_TYPE = "application/x-msgpack"
+
+
 @app.post("/process-text", response_model=TodoResponse)
-def process_text_endpoint(request_body: TextRequest):
+async def process_text_endpoint(
+    request_body: TextRequest,
+    request: Request,
+    embedding_format: EmbeddingFormat = Query("json"),
+):
     """
     사용자의 자연어 텍스트를 받아 TODO 항목을 추출하고 처리합니다.
+    embedding_format으로 임베딩 인코딩을 고를 수 있고, Accept: application/x-msgpack이면 msgpack으로 응답합니다.
     """
     input_text = request_body.text
-    processed_todos = agent.process_text(input_text)
+    use_msgpack = MSGPACK_MEDIA_TYPE in request.headers.get("accept", "")
+    if use_msgpack:
+        # 응답할 수 없는 요청이면 NLP 파이프라인을 돌리기 전에 406을 반환
+        _require_msgpack()
+    async with nlp_limiter:
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(
+            nlp_executor, partial(agent.process_texts, [input_text], embedding_as_list=False)
+        )
+        # 인덱싱은 요청한 경우에만, 같은 실행기를 쓰므로 동시 실행 수/대기열 제한 안에서 수행
+        index_ids = None
+        if todo_index is not None and request_body.index_todos:
+            index_ids = await loop.run_in_executor(nlp_executor, _index_todos, request_body.user_id, results[0])
+
+    target = "msgpack" if use_msgpack else "orjson"
+    final_todos = [
+        _format_todo(request_body.user_id, item, embedding_format, target)
+        for item in results[0]
+    ]
+    if index_ids is not None:
+        for formatted, index_id in zip(final_todos, index_ids):
+            formatted["index_id"] = index_id
+
+    payload = {"success": True, "todos": final_todos}
+    if use_msgpack:
+        return _msgpack_response(payload)
+    # 응답 형식이 이미 TodoResponse와 일치하므로 pydantic 재검증/jsonable_encoder를 건너뛰고
+    # orjson으로 numpy 배열을 바로 직렬화합니다.
+    return _json_response(payload)
+
+
+def _index_todos(user_id: str, todos: List[Dict[str, Any]]) -> List[Optional[int]]:
+    """
+    처리된 할 일의 임베딩을 사용자 벡터 인덱스에 추가합니다.
 
-    final_todos = []
-    for item in processed_todos:
+    Returns:
+        List[Optional[int]]: todos와 같은 순서의 인덱스 항목 ID. 임베딩이 없어 저장하지 않은 항목은 None입니다.
+    """
+    positions = [i for i, todo in enumerate(todos) if len(todo["embedding"])]
+    index_ids: List[Optional[int]] = [None] * len(todos)
+    if not positions:
+        return index_ids
+    ids = todo_index.add(
+        user_id,
+        np.stack([np.asarray(todos[i]["embedding"], dtype=np.float32) for i in positions]),
+        [{key: todos[i][key] for key in ("todo", "date", "time", "category")} for i in positions],
+    )
+    for i, index_id in zip(positions, ids):
+        index_ids[i] = index_id
+    return index_ids
+
+
+def _encode_embedding(vector: np.ndarray, embedding_format: str, target: str = "json"):
+    """
+    임베딩 배열을 요청된 형식으로 인코딩합니다.
+
+    Args:
+        vector (np.ndarray): float32 임베딩.
+        embedding_format (str): 'json', 'base64-f16', 'base64-f32'.
+        target (str): 직렬화 방식. 'orjson'은 numpy 배열을 그대로, 'msgpack'은 바이너리 형식을 바이트 그대로 받습니다.
+    """
+    if embedding_format == "json":
         # 'embedding' 값을 반올림하여 간소화
-        embedding_list = [round(v, 4) for v in item["embedding"]]
-
-        ordered_item = {
-            "user_id": request_body.user_id,
-            "todo": item["todo"],
-            "date": item["date"],
-            "time": item["time"],
-            "original_sentence": item["original_sentence"],
-            "embedding": embedding_list,
-            "category": item["category"],
-        }
-        final_todos.append(ordered_item)
+        rounded = np.round(vector.astype(np.float64), 4)
+        return rounded if target == "orjson" else rounded.tolist()
+
+    dtype = "<f2" if embedding_format == "base64-f16" else "<f4"
+    data = vector.astype(dtype).tobytes()
+    return data if target == "msgpack" else base64.b64encode(data).decode("ascii")
+
+
+def _format_todo(
+    user_id: str, item: Dict[str, Any], embedding_format: str = "json", target: str = "json"
+) -> Dict[str, Any]:
+    """ NLPAgent 결과 항목을 API 응답 형식으로 변환합니다. """
+    formatted = {
+        "user_id": user_id,
+        "todo": item["todo"],
+        "date": item["date"],
+        "time": item["time"],
+        "original_sentence": item["original_sentence"],
+    }
+    if embedding_format != "none":
+        formatted["embedding"] = _encode_embedding(
+            np.asarray(item["embedding"], dtype=np.float32), embedding_format, target
+        )
+    formatted["category"] = item["category"]
+    formatted["category_confidence"] = round(item["category_confidence"], 4)
+    return formatted
+
+
+def _json_response(payload: Dict[str, Any]) -> Response:
+    """ orjson으로 numpy 배열까지 바로 직렬화한 JSON 응답 (배치 NDJSON 줄과 같은 옵션) """
+    return Response(orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY), media_type="application/json")
+
+
+def _require_msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        raise HTTPException(status_code=406, detail="msgpack 응답을 사용하려면 서버에 msgpack 패키지가 필요합니다.")
+    return msgpack
+
+
+def _msgpack_response(payload: Dict[str, Any]) -> Response:
+    msgpack = _require_msgpack()
+    return Response(content=msgpack.packb(payload, use_bin_type=True), media_type=MSGPACK_MEDIA_TYPE)
+
+
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "64"))
+BATCH_MAX_BODY_BYTES = int(os.getenv("BATCH_MAX_BODY_BYTES", str(32 * 1024 * 1024)))
+
+
+async def _read_batch_items(request: Request) -> List[Tuple[int, Any]]:
+    """
+    배치 요청 본문을 끝까지 읽어 (index, TextRequest 또는 오류 메시지) 목록으로 만듭니다.
+    Content-Type이 application/x-ndjson이면 한 줄에 한 항목으로 읽습니다.
+
+    응답 스트리밍이 시작된 뒤에는 Starlette가 연결 종료 감지를 위해 요청 메시지를 함께 소비하므로,
+    본문은 반드시 StreamingResponse를 반환하기 전에 모두 읽어야 합니다 (BATCH_MAX_BODY_BYTES 제한).
+    """
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > BATCH_MAX_BODY_BYTES:
+            raise HTTPException(
+                status_code=413,
+                detail=f"배치 요청 본문이 너무 큽니다 (최대 {BATCH_MAX_BODY_BYTES} 바이트). 나누어 보내 주세요.",
+            )
+
+    if request.headers.get("content-type", "").startswith("application/x-ndjson"):
+        items = []
+        for line in bytes(body).split(b"\n"):
+            if not line.strip():
+                continue
+            try:
+                item = TextRequest.model_validate(orjson.loads(line))
+            except (ValueError, ValidationError) as e:
+                item = f"잘못된 항목입니다: {e}"
+            items.append((len(items), item))
+        return items
+
+    try:
+        parsed = BatchTextRequest.model_validate(orjson.loads(body))
+    except (ValueError, ValidationError) as e:
+        raise HTTPException(status_code=422, detail=f"잘못된 배치 요청입니다: {e}")
+    return list(enumerate(parsed.items))
+
+
+async def _process_batch_chunk(chunk: List[Any], embedding_format: str = "json") -> List[bytes]:
+    """ 청크 단위로 파싱 + 배치 임베딩/매칭을 수행하고 NDJSON 줄 목록을 반환합니다. """
+    valid = [(index, item) for index, item in chunk if isinstance(item, TextRequest)]
+    async with nlp_limiter:
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(
+            nlp_executor, partial(agent.process_texts, [item.text for _, item in valid], embedding_as_list=False)
+        )
+
+    lines = []
+    processed = {index: (item, todos) for (index, item), todos in zip(valid, results)}
+    for index, item in chunk:
+        if index in processed:
+            item, todos = processed[index]
+            line = {
+                "index": index,
+                "user_id": item.user_id,
+                "success": True,
+                "todos": [_format_todo(item.user_id, todo, embedding_format, "orjson") for todo in todos],
+            }
+        else:
+            line = {"index": index, "success": False, "error": item}
+        lines.append(orjson.dumps(line, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE))
+    return lines
+
+
+def _batch_error_lines(chunk: List[Any], detail: str) -> List[bytes]:
+    """ 청크를 처리하지 못했을 때 항목마다 실패 줄을 만들어 NDJSON 응답이 중간에 끊기지 않게 합니다. """
+    return [
+        orjson.dumps({"index": index, "success": False, "error": detail}, option=orjson.OPT_APPEND_NEWLINE)
+        for index, _ in chunk
+    ]
 
-    return {"success": True, "todos": final_todos}
+
+@app.post("/process-text/batch")
+async def process_text_batch_endpoint(request: Request, embedding_format: EmbeddingFormat = Query("json")):
+    """
+    여러 {user_id, text} 항목을 한 번에 처리합니다 (오프라인 백필용).
+    본문은 {"items": [...]} JSON 또는 한 줄에 한 항목인 NDJSON(application/x-ndjson)을 받으며,
+    BATCH_CHUNK_SIZE 단위로 처리가 끝나는 대로 결과를 NDJSON으로 스트리밍합니다.
+
+    첫 청크는 응답 헤더를 보내기 전에 처리하므로 NLP 대기열이 가득 차 있으면 503(Retry-After)을 그대로 반환합니다.
+    스트리밍 도중 대기열 초과로 거절된 청크는 항목마다 {"index", "success": false, "error"} 줄로 알립니다.
+    """
+    items = await _read_batch_items(request)
+    chunks = [items[start:start + BATCH_CHUNK_SIZE] for start in range(0, len(items), BATCH_CHUNK_SIZE)]
+    first_lines = await _process_batch_chunk(chunks[0], embedding_format) if chunks else []
+
+    async def stream():
+        for line in first_lines:
+            yield line
+        for chunk in chunks[1:]:
+            try:
+                lines = await _process_batch_chunk(chunk, embedding_format)
+            except HTTPException as e:
+                lines = _batch_error_lines(chunk, e.detail)
+            for line in lines:
+                yield line
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@app.post("/todos/search")
+async def search_todos_endpoint(request_body: TodoSearchRequest):
+    """
+    사용자 벡터 인덱스에서 입력 텍스트와 비슷한 할 일을 찾습니다.
+    유사도가 TODO_DUPLICATE_THRESHOLD 이상이면 duplicate=true로 표시합니다 ("이미 있는 할 일입니다").
+    exclude_ids의 항목은 제외하므로, 저장 후 검색할 때 방금 저장한 할 일이 자기 자신과 중복으로 잡히지 않습니다.
+    """
+    if todo_index is None:
+        raise HTTPException(status_code=404, detail="할 일 벡터 인덱스가 비활성화되어 있습니다 (TODO_INDEX 설정 필요).")
+
+    def search():
+        query = agent.embed_batch([request_body.text])[0].cpu().numpy()
+        return todo_index.search(request_body.user_id, query, request_body.k, request_body.exclude_ids)
+
+    async with nlp_limiter:
+        loop = asyncio.get_running_loop()
+        matches = await loop.run_in_executor(nlp_executor, search)
+
+    return _json_response({
+        "success": True,
+        "results": [
+            {
+                **match.item,
+                "index_id": match.id,
+                "score": round(match.score, 4),
+                "duplicate": match.score >= TODO_DUPLICATE_THRESHOLD,
+            }
+            for match in matches
+        ],
+    })
 
 
 @app.post("/api/model/recommendations")
-def get_recommendations_endpoint(request_body: RecommendationRequest):
+async def get_recommendations_endpoint(
+    request_body: RecommendationRequest,
+    mode: Literal["llm", "local"] = Query("llm"),
+):
     """
     사용자의 과거 및 현재 데이터를 기반으로 TODO 항목을 추천합니다.
+    mode=local이면 LLM 없이 임베딩 기반 로컬 추천기로 즉시 응답합니다.
     """
     print("추천 API 엔드포인트 호출됨.")
     try:
@@ -109,11 +547,73 @@ def get_recommendations_endpoint(request_body: RecommendationRequest):
         p_data = request_body.p_data
         h_data = request_body.h_data
 
-        recommendations = recommendation_system.run_recommendation_process(p_data, h_data)
+        async with recommendation_limiter:
+            recommendations = await recommendation_system.arun_recommendation_process(p_data, h_data, mode=mode)
         return recommendations
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"추천 생성 중 오류 발생: {e}")
 
 
+@app.post("/api/model/recommendations/stream")
+async def stream_recommendations_endpoint(request_body: RecommendationRequest):
+    """
+    추천을 Server-Sent Events로 스트리밍합니다. 각 추천 항목이 완성되는 즉시
+    'recommendation' 이벤트로, 추천 이유는 마지막 'reason' 이벤트로 보내고 'done'으로 끝납니다.
+
+    응답 헤더를 보내기 전에 recommendation_limiter 자리를 얻으므로 대기열 초과는 503(Retry-After)으로 응답합니다.
+    추천 생성은 별도 태스크가 이벤트 큐로 넘기고 생성이 끝나는 즉시 자리를 반납하므로,
+    읽기를 멈춘 느린 클라이언트가 limiter 자리를 붙잡지 않습니다.
+    """
+    print("스트리밍 추천 API 엔드포인트 호출됨.")
+
+    def sse(event: str, data: Any) -> str:
+        return f"event: {event}\ndata: {orjson.dumps(data).decode()}\n\n"
+
+    await recommendation_limiter.acquire()
+    released = False
+
+    def release_once():
+        nonlocal released
+        if not released:
+            released = True
+            recommendation_limiter.release()
+
+    events: asyncio.Queue = asyncio.Queue()
+
+    async def produce():
+        try:
+            async for event, data in recommendation_system.astream_recommendations(
+                request_body.p_data, request_body.h_data
+            ):
+                events.put_nowait((event, data))
+        except Exception as e:
+            events.put_nowait(("error", f"추천 생성 중 오류 발생: {e}"))
+        finally:
+            release_once()
+            events.put_nowait(None)
+
+    producer = asyncio.ensure_future(produce())
+
+    async def event_stream():
+        try:
+            while (item := await events.get()) is not None:
+                yield sse(*item)
+            yield sse("done", {})
+        finally:
+            # 클라이언트가 먼저 연결을 끊으면 생성을 취소 (시작 전에 취소된 태스크는 finally가 돌지 않으므로 여기서도 반납)
+            if not producer.done():
+                producer.cancel()
+                await asyncio.wait([producer])
+            release_once()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=9000)
\ No newline at end of file
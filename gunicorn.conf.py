@@ -0,0 +1,39 @@
+# 멀티 프로세스 서빙 설정: `gunicorn -c gunicorn.conf.py app:app`
+#
+# preload_app으로 마스터 프로세스에서 모델(ko-sroberta)과 MeCab을 한 번만 로딩한 뒤 fork 합니다.
+# 자식 워커는 읽기 전용 가중치를 copy-on-write 페이지로 공유하므로
+# 워커 수를 늘려도 RSS가 모델 크기만큼 배로 늘지 않습니다.
+import gc
+import os
+
+import torch
+
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+
+# 워커당 torch intra-op 스레드 수 (기본: 코어 수 / 워커 수)
+threads_per_worker = int(
+    os.getenv("TORCH_THREADS_PER_WORKER", str(max(1, (os.cpu_count() or 1) // workers)))
+)
+
+# 마스터에서는 단일 스레드로 워밍업합니다. fork 이전에 OpenMP 스레드 풀이 생기면
+# 자식 프로세스의 첫 병렬 연산이 멈출 수 있습니다.
+torch.set_num_threads(1)
+
+
+def when_ready(server):
+    """ fork 직전: 지연 로딩되는 모델을 마스터에서 미리 올리고 GC 대상에서 제외합니다. """
+    import app
+
+    app.warmup_for_fork()
+    # 이후 생성되는 자식에서 GC가 공유 객체 헤더를 건드려 페이지가 복사되는 것을 방지
+    gc.freeze()
+    server.log.info("모델 로딩 완료, 워커 %d개를 fork 합니다.", workers)
+
+
+def post_fork(server, worker):
+    torch.set_num_threads(threads_per_worker)
+    server.log.info("워커 %s: torch 스레드 %d개", worker.pid, threads_per_worker)
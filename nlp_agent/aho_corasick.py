@@ -0,0 +1,76 @@
+from collections import deque
+from typing import Dict, List, Tuple, Iterable
+
+
+class AhoCorasick:
+    def __init__(self, words: Iterable[str]):
+        """
+        여러 단어를 한 번의 텍스트 순회로 찾는 Aho-Corasick 오토마톤을 생성합니다.
+
+        Args:
+            words (Iterable[str]): 찾을 단어 목록 (빈 문자열은 무시).
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # 각 상태에서 끝나는 단어들의 길이 (출력 링크를 따라 병합됨)
+        self._outputs: List[List[int]] = [[]]
+
+        for word in words:
+            if word:
+                self._add(word)
+        self._build()
+
+    def _add(self, word: str):
+        state = 0
+        for char in word:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            state = next_state
+        if len(word) not in self._outputs[state]:
+            self._outputs[state].append(len(word))
+
+    def _build(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                candidate = self._goto[fail].get(char, 0)
+                self._fail[next_state] = candidate if candidate != next_state else 0
+                self._outputs[next_state].extend(
+                    length for length in self._outputs[self._fail[next_state]]
+                    if length not in self._outputs[next_state]
+                )
+
+    def find_all(self, text: str) -> List[Tuple[int, int]]:
+        """ 겹침을 포함한 모든 매치의 (start, end) 목록 """
+        matches = []
+        state = 0
+        for i, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for length in self._outputs[state]:
+                matches.append((i + 1 - length, i + 1))
+        return matches
+
+    def find_spans(self, text: str) -> List[Tuple[int, int]]:
+        """
+        겹치지 않는 매치 구간을 반환합니다. 왼쪽에서 먼저 시작하는 매치를, 같은 위치라면 더 긴 매치를 우선합니다.
+        (예: '카모카'와 '카모'가 모두 등록되어 있으면 '카모카'를 선택)
+        """
+        spans = []
+        last_end = 0
+        for start, end in sorted(self.find_all(text), key=lambda m: (m[0], -m[1])):
+            if start >= last_end:
+                spans.append((start, end))
+                last_end = end
+        return spans
@@ -0,0 +1,194 @@
+"""
+JSONL 코퍼스를 파싱/임베딩하는 오프라인 배치 도구.
+
+    python -m nlp_agent.batch notes.jsonl --output-dir out/ --workers 8
+
+입력은 한 줄에 하나의 JSON 객체({"user_id": ..., "text": ...})입니다.
+MeCab 파싱은 프로세스 풀에서, 임베딩은 큰 배치로 메인 프로세스에서 수행하며
+결과는 샤드 단위로 저장합니다.
+
+    out/todos-00000.jsonl        투두 메타데이터 (embeddings 파일의 행 순서와 동일한 사이드카 인덱스)
+    out/embeddings-00000.npy     (N, dim) float32 임베딩 (np.load(..., mmap_mode="r")로 읽기)
+    out/checkpoint.json          처리 완료된 입력 줄 수와 샤드 수 (재실행 시 이어서 처리)
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Any, List, Iterator, Optional, Tuple
+
+import numpy as np
+
+from .embedder import TextEmbedder
+from .matcher import ToDoMatcher
+from .parser import Parser
+
+CHECKPOINT_FILE = "checkpoint.json"
+
+_worker_parser: Optional[Parser] = None
+_worker_verbose = False
+
+
+def _init_worker(user_dictionary_path: Optional[str], verbose: bool):
+    global _worker_parser, _worker_verbose
+    _worker_verbose = verbose
+    with contextlib.redirect_stdout(io.StringIO()):
+        _worker_parser = Parser(user_dictionary_path=user_dictionary_path)
+
+
+def _parse_text(text: str) -> List[Dict[str, Any]]:
+    """ 워커 프로세스에서 한 텍스트를 파싱합니다. (Parser의 단계별 출력은 기본적으로 숨김) """
+    if _worker_verbose:
+        return _worker_parser.parse_multiple_sentences(text)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return _worker_parser.parse_multiple_sentences(text)
+
+
+def load_checkpoint(output_dir: str) -> Dict[str, int]:
+    path = os.path.join(output_dir, CHECKPOINT_FILE)
+    if not os.path.exists(path):
+        return {"lines_done": 0, "shards": 0, "todos": 0}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_checkpoint(output_dir: str, checkpoint: Dict[str, int]):
+    path = os.path.join(output_dir, CHECKPOINT_FILE)
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+    os.replace(f"{path}.tmp", path)
+
+
+def iter_records(input_path: str, skip: int, text_field: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """ 입력 JSONL에서 (줄 번호, 레코드)를 읽습니다. 처리 완료된 앞부분은 건너뜁니다. """
+    with open(input_path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(islice(f, skip, None), start=skip):
+            line = line.strip()
+            if not line:
+                yield line_no, {text_field: ""}
+                continue
+            try:
+                yield line_no, json.loads(line)
+            except json.JSONDecodeError:
+                print(f"⚠️ {line_no}번째 줄 JSON 파싱 실패, 건너뜀")
+                yield line_no, {text_field: ""}
+
+
+def _write_shard(output_dir: str, shard: int, rows: List[Dict[str, Any]], embeddings: np.ndarray):
+    """ 샤드를 임시 파일로 쓴 뒤 이름을 바꿔, 중단되더라도 반쯤 쓰인 샤드가 남지 않게 합니다. """
+    todos_path = os.path.join(output_dir, f"todos-{shard:05d}.jsonl")
+    embeddings_path = os.path.join(output_dir, f"embeddings-{shard:05d}.npy")
+
+    with open(f"{embeddings_path}.tmp", "wb") as f:
+        np.save(f, embeddings)
+    with open(f"{todos_path}.tmp", "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    os.replace(f"{embeddings_path}.tmp", embeddings_path)
+    os.replace(f"{todos_path}.tmp", todos_path)
+
+
+def run(
+    input_path: str,
+    output_dir: str,
+    workers: int,
+    shard_lines: int,
+    embed_batch_size: int,
+    text_field: str = "text",
+    user_dictionary_path: Optional[str] = None,
+    artifact_dir: Optional[str] = None,
+    embed_backend: str = "torch",
+    verbose: bool = False,
+    categories_path: Optional[str] = None,
+):
+    os.makedirs(output_dir, exist_ok=True)
+    checkpoint = load_checkpoint(output_dir)
+    if checkpoint["lines_done"]:
+        print(f"체크포인트에서 재개: {checkpoint['lines_done']}줄 처리됨, 샤드 {checkpoint['shards']}개")
+
+    embedder = TextEmbedder(backend=embed_backend, bucket_size=embed_batch_size)
+    matcher = ToDoMatcher(embedder, artifact_dir=artifact_dir, categories_path=categories_path)
+
+    records = iter_records(input_path, checkpoint["lines_done"], text_field)
+    started = time.perf_counter()
+    lines_this_run = 0
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(user_dictionary_path, verbose)
+    ) as pool:
+        while True:
+            batch = list(islice(records, shard_lines))
+            if not batch:
+                break
+
+            texts = [record.get(text_field) or "" for _, record in batch]
+            parsed = pool.map(_parse_text, texts, chunksize=max(1, len(texts) // (workers * 4)))
+
+            rows = []
+            for (line_no, record), todos in zip(batch, parsed):
+                for todo in todos:
+                    if todo["todo"]:
+                        rows.append({"line": line_no, "user_id": record.get("user_id"), **todo})
+
+            embeddings = embedder.embed_batch([row["todo"] for row in rows])
+            for row, match in zip(rows, matcher.match_categories(embeddings)):
+                row["category"] = match.category
+                row["category_confidence"] = round(match.confidence, 4)
+
+            _write_shard(output_dir, checkpoint["shards"], rows, embeddings.numpy().astype(np.float32))
+            checkpoint["lines_done"] = batch[-1][0] + 1
+            checkpoint["shards"] += 1
+            checkpoint["todos"] += len(rows)
+            save_checkpoint(output_dir, checkpoint)
+
+            lines_this_run += len(batch)
+            elapsed = time.perf_counter() - started
+            print(
+                f"샤드 {checkpoint['shards'] - 1:05d}: {len(batch)}줄 -> 투두 {len(rows)}개 | "
+                f"누적 {checkpoint['lines_done']}줄 | {lines_this_run / elapsed:.1f} rows/sec"
+            )
+
+    print(f"완료: 총 {checkpoint['lines_done']}줄, 투두 {checkpoint['todos']}개, 샤드 {checkpoint['shards']}개")
+
+
+def load_embeddings(output_dir: str) -> Iterator[Tuple[List[Dict[str, Any]], np.ndarray]]:
+    """ 저장된 샤드를 (투두 메타데이터 목록, mmap 임베딩 배열) 쌍으로 읽습니다. """
+    checkpoint = load_checkpoint(output_dir)
+    for shard in range(checkpoint["shards"]):
+        with open(os.path.join(output_dir, f"todos-{shard:05d}.jsonl"), "r", encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f]
+        yield rows, np.load(os.path.join(output_dir, f"embeddings-{shard:05d}.npy"), mmap_mode="r")
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="JSONL 텍스트 코퍼스를 파싱/임베딩하여 샤드로 저장합니다.")
+    arg_parser.add_argument("input", help="입력 JSONL 파일 (한 줄에 {\"user_id\", \"text\"})")
+    arg_parser.add_argument("--output-dir", required=True)
+    arg_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="파싱 프로세스 수")
+    arg_parser.add_argument("--shard-lines", type=int, default=5000, help="샤드(체크포인트)당 입력 줄 수")
+    arg_parser.add_argument("--embed-batch-size", type=int, default=256, help="한 번에 임베딩할 투두 수")
+    arg_parser.add_argument("--text-field", default="text")
+    arg_parser.add_argument("--user-dictionary", default=None, help="MeCab 사용자 사전(.dic) 경로")
+    arg_parser.add_argument("--artifact-dir", default=".cache/artifacts", help="카테고리 행렬 저장 위치")
+    arg_parser.add_argument("--categories", default=None, help="카테고리/프로토타입 설정 파일 (기본: nlp_agent/categories.json)")
+    arg_parser.add_argument("--backend", default="torch", choices=TextEmbedder.BACKENDS)
+    arg_parser.add_argument("--verbose", action="store_true", help="Parser의 단계별 출력 표시")
+    args = arg_parser.parse_args()
+
+    run(
+        args.input,
+        args.output_dir,
+        workers=args.workers,
+        shard_lines=args.shard_lines,
+        embed_batch_size=args.embed_batch_size,
+        text_field=args.text_field,
+        user_dictionary_path=args.user_dictionary,
+        artifact_dir=args.artifact_dir,
+        embed_backend=args.backend,
+        verbose=args.verbose,
+        categories_path=args.categories,
+    )
@@ -0,0 +1,125 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, Any, List, Tuple
+
+import torch
+
+from .embedder import TextEmbedder
+
+
+class EmbeddingBatcher:
+    def __init__(self, embedder: TextEmbedder, max_batch_size: int = 64, max_wait_ms: float = 5.0):
+        """
+        여러 요청(스레드)에서 들어온 임베딩 작업을 짧은 시간 동안 모아 한 번의 forward pass로 처리합니다.
+
+        Args:
+            embedder (TextEmbedder): 실제 임베딩을 수행하는 공유 인스턴스.
+            max_batch_size (int): 한 번의 forward pass에 담을 최대 텍스트 수.
+            max_wait_ms (float): 첫 작업이 들어온 뒤 추가 작업을 기다리는 최대 시간(ms).
+        """
+        self.embedder = embedder
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+
+        self._queue: "queue.Queue[Tuple[List[str], Future]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._worker_pid = None
+
+        # 처리량 메트릭
+        self._batches_run = 0
+        self._texts_embedded = 0
+        self._pending_texts = 0
+        self._last_batch_size = 0
+
+    def _ensure_worker(self):
+        """ 워커 스레드를 지연 생성합니다. fork 이후 자식 프로세스에서는 새로 띄웁니다. """
+        if self._worker is not None and self._worker_pid == os.getpid() and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker_pid == os.getpid() and self._worker.is_alive():
+                return
+            if self._worker_pid != os.getpid():
+                # fork로 복사된 큐/카운터는 부모의 상태이므로 초기화
+                self._queue = queue.Queue()
+                self._pending_texts = 0
+            self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+            self._worker_pid = os.getpid()
+            self._worker.start()
+
+    def submit(self, texts: List[str]) -> Future:
+        """
+        임베딩 작업을 큐에 넣고, (len(texts), dim) 텐서를 돌려줄 Future를 반환합니다.
+        """
+        future: Future = Future()
+        if not texts:
+            future.set_result(self.embedder.embed_batch([]))
+            return future
+
+        self._ensure_worker()
+        with self._lock:
+            self._pending_texts += len(texts)
+        self._queue.put((list(texts), future))
+        return future
+
+    def embed_batch(self, texts: List[str]) -> torch.Tensor:
+        """ TextEmbedder.embed_batch와 동일한 인터페이스의 블로킹 호출 """
+        return self.submit(texts).result()
+
+    def _collect(self) -> List[Tuple[List[str], Future]]:
+        """ 첫 작업을 기다린 뒤, max_wait_ms 또는 max_batch_size에 도달할 때까지 작업을 모읍니다. """
+        jobs = [self._queue.get()]
+        total = len(jobs[0][0])
+        deadline = time.monotonic() + self.max_wait_ms / 1000.0
+
+        while total < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                job = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            jobs.append(job)
+            total += len(job[0])
+        return jobs
+
+    def _run(self):
+        while True:
+            jobs = self._collect()
+            texts = [text for job_texts, _ in jobs for text in job_texts]
+
+            try:
+                embeddings = self.embedder.embed_batch(texts)
+            except Exception as e:
+                for _, future in jobs:
+                    future.set_exception(e)
+            else:
+                # 각 호출자에게 자신의 행만 잘라서 전달
+                offset = 0
+                for job_texts, future in jobs:
+                    future.set_result(embeddings[offset:offset + len(job_texts)])
+                    offset += len(job_texts)
+
+            with self._lock:
+                self._pending_texts -= len(texts)
+                self._batches_run += 1
+                self._texts_embedded += len(texts)
+                self._last_batch_size = len(texts)
+
+    def metrics(self) -> Dict[str, Any]:
+        """ 큐 깊이 및 배치 처리량 메트릭을 반환합니다. """
+        with self._lock:
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait_ms,
+                "queue_depth": self._queue.qsize(),
+                "pending_texts": self._pending_texts,
+                "batches_run": self._batches_run,
+                "texts_embedded": self._texts_embedded,
+                "last_batch_size": self._last_batch_size,
+                "avg_batch_size": (self._texts_embedded / self._batches_run) if self._batches_run else 0.0,
+            }
@@ -0,0 +1,151 @@
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+import torch
+
+
+def normalize_text(text: str) -> str:
+    """ 캐시 키용 텍스트 정규화: 유니코드 NFC, 연속 공백 축약, 앞뒤 공백 제거 """
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text)).strip()
+
+
+class EmbeddingCache:
+    def __init__(self, model_name: str, max_entries: int = 10000, db_path: Optional[str] = None):
+        """
+        (모델 이름, 정규화된 텍스트)를 키로 하는 2단계 임베딩 캐시.
+        1단계는 크기 제한이 있는 메모리 LRU, 2단계는 SQLite에 float16으로 저장되는 디스크 캐시입니다.
+
+        Args:
+            model_name (str): 임베딩 모델 이름. 모델이 바뀌면 다른 키 공간을 사용합니다.
+            max_entries (int): 메모리 LRU에 보관할 최대 항목 수.
+            db_path (Optional[str]): SQLite 파일 경로. None이면 메모리 캐시만 사용합니다.
+        """
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.db_path = db_path
+
+        self._lru: "OrderedDict[Tuple[str, str], torch.Tensor]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if self.db_path:
+            self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        """ SQLite 연결을 (프로세스별로) 엽니다. fork된 자식은 새 연결을 사용합니다. """
+        if self._conn is not None and self._conn_pid == os.getpid():
+            return self._conn
+
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL, text TEXT NOT NULL, vector BLOB NOT NULL,"
+            " PRIMARY KEY (model, text))"
+        )
+        conn.commit()
+        self._conn = conn
+        self._conn_pid = os.getpid()
+        return conn
+
+    def _namespace(self, variant: str) -> str:
+        """ SQLite model 컬럼 값: 모델 이름 + 임베딩 설정(백엔드, max_length 등) """
+        return f"{self.model_name}#{variant}" if variant else self.model_name
+
+    def _remember(self, key, vector: torch.Tensor):
+        self._lru[key] = vector
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def get_many(self, texts: List[str], variant: str = "") -> Dict[str, torch.Tensor]:
+        """
+        캐시에 있는 텍스트의 임베딩을 반환합니다.
+
+        Args:
+            texts (List[str]): 조회할 텍스트 목록.
+            variant (str): 같은 텍스트라도 임베딩 값이 달라지는 설정(예: 'torch:max_length=64').
+                설정이 다르면 별도의 키 공간을 사용합니다.
+
+        Returns:
+            Dict[str, torch.Tensor]: 정규화된 텍스트 -> (dim,) 임베딩. 없는 항목은 포함되지 않습니다.
+        """
+        keys = list(dict.fromkeys(normalize_text(t) for t in texts))
+        found: Dict[str, torch.Tensor] = {}
+        missing: List[str] = []
+
+        with self._lock:
+            for key in keys:
+                vector = self._lru.get((variant, key))
+                if vector is not None:
+                    self._lru.move_to_end((variant, key))
+                    found[key] = vector
+                    self.memory_hits += 1
+                else:
+                    missing.append(key)
+
+            if missing and self.db_path:
+                conn = self._connect()
+                placeholders = ",".join("?" * len(missing))
+                rows = conn.execute(
+                    f"SELECT text, vector FROM embeddings WHERE model = ? AND text IN ({placeholders})",
+                    [self._namespace(variant), *missing],
+                ).fetchall()
+                for key, blob in rows:
+                    vector = torch.frombuffer(bytearray(blob), dtype=torch.float16).float()
+                    vector = torch.nn.functional.normalize(vector, p=2, dim=0)
+                    found[key] = vector
+                    self._remember((variant, key), vector)
+                    self.disk_hits += 1
+
+            self.misses += sum(1 for key in missing if key not in found)
+        return found
+
+    def put_many(self, texts: List[str], embeddings: torch.Tensor, variant: str = ""):
+        """
+        새로 계산한 임베딩을 메모리 LRU와 디스크에 저장합니다.
+
+        Args:
+            texts (List[str]): 임베딩한 텍스트 목록.
+            embeddings (torch.Tensor): (len(texts), dim) 임베딩.
+            variant (str): get_many와 같은 임베딩 설정 구분자.
+        """
+        rows = []
+        namespace = self._namespace(variant)
+        with self._lock:
+            for text, vector in zip(texts, embeddings):
+                key = normalize_text(text)
+                self._remember((variant, key), vector.clone())
+                rows.append((namespace, key, vector.to(torch.float16).numpy().tobytes()))
+
+            if rows and self.db_path:
+                conn = self._connect()
+                conn.executemany("INSERT OR REPLACE INTO embeddings (model, text, vector) VALUES (?, ?, ?)", rows)
+                conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """ 캐시 적중/미스 카운터를 반환합니다. """
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_entries": len(self._lru),
+                "max_entries": self.max_entries,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": ((self.memory_hits + self.disk_hits) / lookups) if lookups else 0.0,
+                "db_path": self.db_path,
+            }
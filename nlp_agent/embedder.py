@@ -1,19 +1,96 @@
+import threading
+
 import torch
 from transformers import AutoTokenizer, AutoModel
-from typing import Dict, Any, List
-from mecab import MeCab
+from typing import Dict, Any, List, Optional
+
+from .cache import EmbeddingCache, normalize_text
+from .onnx_backend import ONNX_BACKENDS, OnnxEncoder, ensure_onnx_model
 
 class TextEmbedder:
-    def __init__(self, model_name: str = "jhgan/ko-sroberta-multitask"):
-        print(f"임베딩 모델 로딩 중: {model_name}")
-        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-        self.model = AutoModel.from_pretrained(model_name)
-        self.mecab = MeCab()
+    BACKENDS = ("torch",) + ONNX_BACKENDS
+
+    def __init__(
+        self,
+        model_name: str = "jhgan/ko-sroberta-multitask",
+        cache: Optional[EmbeddingCache] = None,
+        backend: str = "torch",
+        onnx_dir: str = ".cache/onnx",
+        max_length: int = 64,
+        bucket_size: int = 32,
+    ):
+        """
+        Args:
+            model_name (str): Hugging Face 모델 이름.
+            cache (Optional[EmbeddingCache]): 설정하면 정규화된 텍스트 기준으로 임베딩을 재사용합니다.
+            backend (str): 추론 백엔드. 'torch'(fp32), 'onnx'(ONNX Runtime fp32), 'onnx-int8'(동적 양자화).
+            onnx_dir (str): ONNX 백엔드용 모델 파일을 내보내고 읽을 디렉터리.
+            max_length (int): 토큰 최대 길이. 투두는 보통 20 토큰 미만이므로 짧게 자릅니다.
+            bucket_size (int): 길이순으로 정렬한 뒤 한 번에 패딩/실행하는 텍스트 수.
+        """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"지원하지 않는 임베딩 백엔드입니다: {backend} (가능: {', '.join(self.BACKENDS)})")
+        self.model_name = model_name
+        self.cache = cache
+        self.backend = backend
+        self.onnx_dir = onnx_dir
+        self.max_length = max_length
+        self.bucket_size = bucket_size
+        if cache is not None and cache.model_name != self.model_id:
+            raise ValueError(f"임베딩 캐시의 모델({cache.model_name})이 임베더({self.model_id})와 다릅니다.")
         
         self.device = torch.device('cpu')
-        self.model.to(self.device)
-        self.model.eval()
-        print("임베딩 모델 로딩 완료.")
+
+        # 모델은 첫 사용 시점에 로딩 (카테고리 행렬이 디스크에 있으면 기동 시 로딩을 건너뜀)
+        self._tokenizer = None
+        self._model = None
+        self._load_lock = threading.Lock()
+
+    def load(self):
+        """ 토크나이저와 모델을 로딩합니다. 이미 로딩되어 있으면 아무것도 하지 않습니다. """
+        if self._model is not None:
+            return
+        with self._load_lock:
+            if self._model is not None:
+                return
+            print(f"임베딩 모델 로딩 중: {self.model_name} (backend={self.backend})")
+            tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+            if self.backend == "torch":
+                model = AutoModel.from_pretrained(self.model_name)
+                model.to(self.device)
+                model.eval()
+            else:
+                model_path = ensure_onnx_model(self.model_name, self.backend, self.onnx_dir)
+                # 세션은 첫 추론 시 프로세스별로 생성하며 스레드 수도 그때의 torch 설정을 따름
+                model = OnnxEncoder(model_path, self.model_name)
+            self._tokenizer = tokenizer
+            self._model = model
+            print("임베딩 모델 로딩 완료.")
+
+    @property
+    def model_id(self) -> str:
+        """ 캐시/아티팩트 키로 쓰는 식별자. 백엔드가 다르면 임베딩 값도 달라지므로 구분합니다. """
+        if self.backend == "torch":
+            return self.model_name
+        return f"{self.model_name}@{self.backend}"
+
+    def cache_variant(self, max_length: Optional[int] = None) -> str:
+        """ 같은 텍스트의 임베딩 값을 바꾸는 설정(백엔드, 토큰 최대 길이)을 나타내는 캐시/지문용 문자열 """
+        return f"{self.backend}:max_length={max_length or self.max_length}"
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._model is not None
+
+    @property
+    def tokenizer(self):
+        self.load()
+        return self._tokenizer
+
+    @property
+    def model(self):
+        self.load()
+        return self._model
 
     def _mean_pooling(self, model_output, attention_mask):
         token_embeddings = model_output[0]
@@ -30,15 +107,62 @@ class TextEmbedder:
         Returns:
             Dict[str, any]: 임베딩 벡터를 포함하는 딕셔너리.
         """
-        encoded_input = self.tokenizer(text, padding=True, truncation=True, return_tensors='pt').to(self.device)
-        
-        with torch.no_grad():
-            model_output = self.model(**encoded_input)
-        
-        sentence_embeddings = self._mean_pooling(model_output, encoded_input['attention_mask'])
-        
-        sentence_embeddings = torch.nn.functional.normalize(sentence_embeddings, p=2, dim=1)
-        
         return {
-            "embedding": sentence_embeddings.cpu()
-        }
\ No newline at end of file
+            "embedding": self.embed_batch([text])
+        }
+
+    def embed_batch(self, texts: List[str], max_length: Optional[int] = None, use_cache: bool = True) -> torch.Tensor:
+        """
+        여러 텍스트를 한 번에 토크나이즈/패딩하여 단일 forward pass로 임베딩합니다.
+
+        Args:
+            texts (List[str]): 임베딩할 텍스트 목록.
+            max_length (Optional[int]): 토큰 최대 길이. None이면 self.max_length를 사용합니다.
+            use_cache (bool): False이면 임베딩 캐시를 조회/저장하지 않습니다 (재사용되지 않을 긴 텍스트용).
+
+        Returns:
+            torch.Tensor: (N, dim) 크기의 L2 정규화된 임베딩 텐서. 입력 순서를 유지합니다.
+        """
+        if not texts:
+            return torch.empty((0, self.model.config.hidden_size))
+
+        if self.cache is None or not use_cache:
+            return self._forward(texts, max_length)
+
+        # 캐시에 없는 (정규화 기준) 고유 텍스트만 모델에 통과시킴
+        # 토큰 길이 제한이 다르면 임베딩도 달라지므로 백엔드/max_length별로 키 공간을 나눔
+        variant = self.cache_variant(max_length)
+        cached = self.cache.get_many(texts, variant)
+        keys = [normalize_text(t) for t in texts]
+        misses = list(dict.fromkeys(k for k in keys if k not in cached))
+        if misses:
+            computed = self._forward(misses, max_length)
+            self.cache.put_many(misses, computed, variant)
+            cached.update(zip(misses, computed))
+
+        return torch.stack([cached[k] for k in keys])
+
+    def _forward(self, texts: List[str], max_length: Optional[int] = None) -> torch.Tensor:
+        """
+        캐시 없이 모델을 실행하여 (N, dim) 정규화 임베딩을 계산합니다.
+        토큰 길이순으로 정렬해 bucket_size 단위로 패딩하므로 길이가 섞인 배치에서도 패딩 낭비가 적고,
+        결과는 입력 순서로 되돌립니다.
+        """
+        encoded = self.tokenizer(texts, truncation=True, max_length=max_length or self.max_length)
+        order = sorted(range(len(texts)), key=lambda i: len(encoded['input_ids'][i]))
+
+        sentence_embeddings = torch.empty((len(texts), self.model.config.hidden_size))
+        for start in range(0, len(order), self.bucket_size):
+            bucket = order[start:start + self.bucket_size]
+            encoded_input = self.tokenizer.pad(
+                {key: [values[i] for i in bucket] for key, values in encoded.items()},
+                return_tensors='pt',
+            ).to(self.device)
+
+            with torch.no_grad():
+                model_output = self.model(**encoded_input)
+
+            bucket_embeddings = self._mean_pooling(model_output, encoded_input['attention_mask'])
+            sentence_embeddings[bucket] = bucket_embeddings.cpu()
+
+        return torch.nn.functional.normalize(sentence_embeddings, p=2, dim=1)
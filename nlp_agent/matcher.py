@@ -1,47 +1,231 @@
+import hashlib
+import json
+import os
+
+import numpy as np
 import torch
 import torch.nn.functional as F
-from typing import Dict, Any, List, Tuple
+from typing import Dict, Any, List, Tuple, NamedTuple, Optional
 from .embedder import TextEmbedder
 
 
+DEFAULT_CATEGORIES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "categories.json")
+POOLING_METHODS = ("max", "mean")
+
+
+class CategoryMatch(NamedTuple):
+    category: str
+    score: float
+    # 카테고리별 풀링 점수에 온도 softmax를 적용한 최고 카테고리의 확률 ('기타'로 거절되면 0.0)
+    confidence: float = 1.0
+
+
+def load_category_config(path: str) -> Dict[str, Any]:
+    """
+    카테고리 설정 파일(JSON)을 읽어 검증합니다.
+
+    형식:
+        {"pooling": "max", "temperature": 0.05, "default_threshold": 0.55,
+         "categories": {"운동": {"threshold": 0.55, "prototypes": ["헬스장 가기", ...]}, ...}}
+    카테고리 값으로 프로토타입 문구 리스트만 적으면 default_threshold를 사용합니다.
+    temperature는 softmax 보정에 나누는 값이므로 0보다 커야 합니다.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    pooling = config.get("pooling", "max")
+    if pooling not in POOLING_METHODS:
+        raise ValueError(f"지원하지 않는 풀링 방식입니다: {pooling} (가능한 값: {POOLING_METHODS})")
+
+    temperature = float(config.get("temperature", 0.05))
+    if not temperature > 0:
+        raise ValueError(f"temperature는 0보다 커야 합니다: {temperature} ({path})")
+
+    categories = {}
+    for name, spec in config.get("categories", {}).items():
+        if isinstance(spec, list):
+            spec = {"prototypes": spec}
+        prototypes = [p.strip() for p in spec.get("prototypes", []) if p.strip()]
+        if not prototypes:
+            raise ValueError(f"카테고리 '{name}'에 프로토타입 문구가 없습니다: {path}")
+        categories[name] = {"prototypes": prototypes, "threshold": spec.get("threshold")}
+    if not categories:
+        raise ValueError(f"카테고리 설정이 비어 있습니다: {path}")
+
+    return {
+        "pooling": pooling,
+        "temperature": temperature,
+        "default_threshold": config.get("default_threshold"),
+        "categories": categories,
+    }
+
+
 class ToDoMatcher:
-    def __init__(self, embedder: TextEmbedder, similarity_threshold: float = 0.5):
+    def __init__(
+        self,
+        embedder: TextEmbedder,
+        similarity_threshold: Optional[float] = None,
+        artifact_dir: Optional[str] = None,
+        categories_path: Optional[str] = None,
+    ):
         """
-        카테고리 매칭 클래스를 초기화하고, 카테고리 임베딩을 미리 계산합니다.
+        카테고리 매칭 클래스를 초기화하고, 카테고리 프로토타입 임베딩을 미리 계산합니다.
+
+        각 카테고리는 여러 개의 짧은 프로토타입 문구를 가지며, 모든 프로토타입을 (P, dim) 행렬 하나로 쌓아
+        배치당 한 번의 행렬곱으로 점수를 구한 뒤 카테고리별로 max/mean 풀링합니다.
 
         Args:
             embedder (TextEmbedder): 텍스트 임베딩을 담당하는 인스턴스.
-            similarity_threshold (float): 유사도 임계값. 이 값보다 낮으면 카테고리를 할당하지 않습니다.
+            similarity_threshold (Optional[float]): 설정 파일에 임계값이 없는 카테고리에 쓰는 기본 유사도 임계값.
+                이 값보다 낮으면 카테고리를 할당하지 않습니다. 지정하면 설정 파일의 default_threshold보다 우선하며,
+                None이면 default_threshold, 그것도 없으면 0.5를 사용합니다.
+            artifact_dir (Optional[str]): 프로토타입 행렬(.npy)을 저장/로딩할 디렉터리.
+                모델 이름과 프로토타입 문구가 같으면 재계산 없이 mmap으로 로딩합니다.
+            categories_path (Optional[str]): 카테고리 설정 파일 경로. None이면 nlp_agent/categories.json.
         """
         self.embedder = embedder
-        self.similarity_threshold = similarity_threshold
-
-        # 미리 정의된 카테고리와 대표 문구
-        self.categories: Dict[str, str] = {
-            "운동": "헬스장 가기, 운동하기, 산책하기, 러닝, 수영, 요가, 필라테스, 축구, 농구, 야구, 등산",
-            "공부": "공부하기, 책 읽기, 강의 듣기, 인강, 수학 공부, 영어 공부, 코딩 공부, 시험",
-            "장보기": "마트 가기, 장보기, 식료품 사기, 시장 가기, 과일 사기, 채소 사기, 고기 사기, 쌀 사기, 빵 사기, 우유 사기, 계란 사기, 쿠팡, 배달의민족, 요기요, 배달",
-            "업무": "업무하기, 보고서 쓰기, 회의 참여, 이메일 확인, 프레젠테이션 준비, 프로젝트 관리, 업무 미팅, 화상 회의, 전화 회의",
-            "일상": "친구 만나기, 부모님 댁 방문, 약속, 병원 가기, 미용실 가기, 카페 가기, 산책하기, 여행 계획, 영화 보기, 쇼핑하기, 청소하기, 빨래하기, 요리하기",
+        self.artifact_dir = artifact_dir
+        self.categories_path = categories_path or DEFAULT_CATEGORIES_PATH
+
+        config = load_category_config(self.categories_path)
+        self.pooling: str = config["pooling"]
+        self.temperature: float = config["temperature"]
+        if similarity_threshold is None:
+            similarity_threshold = config["default_threshold"] if config["default_threshold"] is not None else 0.5
+        self.similarity_threshold: float = float(similarity_threshold)
+
+        # 카테고리 -> 프로토타입 문구 목록, 카테고리별 임계값
+        self.categories: Dict[str, List[str]] = {
+            name: spec["prototypes"] for name, spec in config["categories"].items()
         }
+        self.category_names: List[str] = list(self.categories.keys())
+        self.thresholds = torch.tensor([
+            spec["threshold"] if spec["threshold"] is not None else self.similarity_threshold
+            for spec in config["categories"].values()
+        ])
+
+        # 프로토타입을 카테고리 순서대로 펼치고, 각 프로토타입이 속한 카테고리 인덱스를 기록
+        self.prototypes: List[str] = [p for name in self.category_names for p in self.categories[name]]
+        self.prototype_categories = torch.tensor([
+            i for i, name in enumerate(self.category_names) for _ in self.categories[name]
+        ])
+        # mean 풀링용 (P, C) 평균 행렬: 유사도 (N, P) @ (P, C) -> 카테고리별 평균
+        counts = torch.bincount(self.prototype_categories, minlength=len(self.category_names)).float()
+        self._mean_pooling = (
+            F.one_hot(self.prototype_categories, len(self.category_names)).float() / counts
+        )
+
+        # 프로토타입 임베딩을 정규화된 (P, dim) 행렬 하나로 미리 계산 및 저장
+        self.prototype_matrix: torch.Tensor = self._load_or_compute_prototype_matrix()
+        print(f"\n카테고리 임베딩 사전 계산 완료 (카테고리 {len(self.category_names)}개, 프로토타입 {len(self.prototypes)}개).")
 
-        # 카테고리 임베딩 미리 계산 및 저장
-        self.category_embeddings: Dict[str, torch.Tensor] = (
-            self._precompute_category_embeddings()
+    def _fingerprint(self) -> str:
+        """ 모델 이름, 임베딩 설정(백엔드, max_length)과 카테고리별 프로토타입 문구(순서 포함)로 행렬의 지문을 만듭니다. """
+        payload = json.dumps(
+            {
+                "model": self.embedder.model_id,
+                "embedding": self.embedder.cache_variant(),
+                "categories": list(self.categories.items()),
+            },
+            ensure_ascii=False,
         )
-        print("\n카테고리 임베딩 사전 계산 완료.")
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    def _artifact_path(self) -> str:
+        return os.path.join(self.artifact_dir, f"prototype_matrix-{self._fingerprint()}.npy")
 
-    def _precompute_category_embeddings(self) -> Dict[str, torch.Tensor]:
+    def _load_or_compute_prototype_matrix(self) -> torch.Tensor:
         """
-        정의된 각 카테고리의 대표 문구를 임베딩하여 딕셔너리에 저장합니다.
+        지문이 일치하는 프로토타입 행렬 파일이 있으면 mmap으로 로딩하고, 없으면 계산 후 저장합니다.
+        """
+        if not self.artifact_dir:
+            return self._precompute_prototype_matrix()
+
+        path = self._artifact_path()
+        if os.path.exists(path):
+            print(f"카테고리 임베딩 로딩: {path}")
+            # 'c'(copy-on-write) 모드: 파일은 공유 매핑, torch 텐서는 쓰기 가능한 배열로 생성
+            return torch.from_numpy(np.load(path, mmap_mode="c"))
+
+        matrix = self._precompute_prototype_matrix()
+        os.makedirs(self.artifact_dir, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, matrix.numpy())
+        os.replace(tmp_path, path)
+        print(f"카테고리 임베딩 저장: {path}")
+        return matrix
+
+    def _precompute_prototype_matrix(self) -> torch.Tensor:
+        """
+        모든 카테고리의 프로토타입 문구를 한 번의 배치로 임베딩하여 (P, dim) 행렬로 쌓습니다.
         """
-        embeddings = {}
         print("카테고리 임베딩 계산 중...")
-        for category, phrase in self.categories.items():
-            # 임베더의 메서드를 활용하여 임베딩만 가져옴
-            embed_result = self.embedder.embed_text(phrase)
-            embeddings[category] = embed_result["embedding"]
-        return embeddings
+        matrix = self.embedder.embed_batch(self.prototypes)
+        return F.normalize(matrix, p=2, dim=1)
+
+    @property
+    def category_matrix(self) -> torch.Tensor:
+        """ 카테고리별 프로토타입 평균을 정규화한 (C, dim) 행렬 (하위 호환용) """
+        return F.normalize(self._mean_pooling.T @ self.prototype_matrix, p=2, dim=1)
+
+    @property
+    def category_embeddings(self) -> Dict[str, torch.Tensor]:
+        """ 카테고리별 (1, dim) 임베딩 딕셔너리 (하위 호환용) """
+        matrix = self.category_matrix
+        return {
+            name: matrix[i].unsqueeze(0)
+            for i, name in enumerate(self.category_names)
+        }
+
+    def category_scores(self, embeddings: torch.Tensor) -> torch.Tensor:
+        """
+        (N, dim) 투두 임베딩의 카테고리별 풀링 점수 (N, C)를 구합니다.
+        프로토타입 수와 관계없이 배치당 행렬곱 한 번입니다.
+        """
+        # (N, dim) x (dim, P) -> (N, P) 코사인 유사도
+        similarities = F.normalize(embeddings, p=2, dim=1) @ self.prototype_matrix.T
+        if self.pooling == "mean":
+            return similarities @ self._mean_pooling
+
+        index = self.prototype_categories.unsqueeze(0).expand_as(similarities)
+        pooled = torch.full(
+            (similarities.size(0), len(self.category_names)), float("-inf"), dtype=similarities.dtype
+        )
+        return pooled.scatter_reduce(1, index, similarities, reduce="amax")
+
+    def match_categories(self, embeddings: torch.Tensor) -> List[CategoryMatch]:
+        """
+        N개의 투두 임베딩을 한 번의 행렬곱으로 모든 카테고리 프로토타입과 비교합니다.
+
+        Args:
+            embeddings (torch.Tensor): (N, dim) 크기의 투두 임베딩.
+
+        Returns:
+            List[CategoryMatch]: 각 투두의 카테고리, 최고 풀링 점수, 신뢰도.
+                점수가 해당 카테고리의 임계값 미만이면 '기타'이며 신뢰도는 0.0입니다.
+        """
+        if embeddings.dim() == 1:
+            embeddings = embeddings.unsqueeze(0)
+        if embeddings.size(0) == 0:
+            return []
+
+        scores = self.category_scores(embeddings)
+        best_scores, best_indices = scores.max(dim=1)
+        # 온도 스케일링한 softmax로 카테고리 간 점수 차이를 확률로 보정
+        confidences = torch.softmax(scores / self.temperature, dim=1).gather(1, best_indices.unsqueeze(1)).squeeze(1)
+        accepted = best_scores >= self.thresholds[best_indices]
+
+        matches = []
+        for score, idx, confidence, ok in zip(
+            best_scores.tolist(), best_indices.tolist(), confidences.tolist(), accepted.tolist()
+        ):
+            if ok:
+                matches.append(CategoryMatch(self.category_names[idx], score, confidence))
+            else:
+                # 거절한 카테고리의 확률을 '기타'의 신뢰도로 보고하지 않음
+                matches.append(CategoryMatch("기타", score, 0.0))
+        return matches
 
     def match_category(self, todo_embedding: torch.Tensor) -> str:
         """
@@ -53,22 +237,9 @@ class ToDoMatcher:
         Returns:
             str: 가장 유사한 카테고리 이름. 임계값 이하일 경우 '기타'를 반환.
         """
-        max_similarity = -1
-        best_match = "기타"
-
-        # 새로운 투두 임베딩과 모든 카테고리 임베딩 간의 유사도 계산
-        for category, category_embed in self.category_embeddings.items():
-            # 코사인 유사도 계산
-            similarity = F.cosine_similarity(
-                todo_embedding, category_embed, dim=1
-            ).item()
-
-            if similarity > max_similarity and similarity >= self.similarity_threshold:
-                max_similarity = similarity
-                best_match = category
-
-        print(f"최고 유사도: {max_similarity:.4f}, 할당된 카테고리: '{best_match}'")
-        return best_match
+        match = self.match_categories(todo_embedding)[0]
+        print(f"최고 유사도: {match.score:.4f}, 신뢰도: {match.confidence:.4f}, 할당된 카테고리: '{match.category}'")
+        return match.category
 
 
 if __name__ == "__main__":
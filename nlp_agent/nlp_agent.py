@@ -1,19 +1,63 @@
 import json
-from typing import Dict, Any, List
+import numpy as np
+from typing import Dict, Any, List, Optional
 
 # .parser, .embedder, .matcher 파일을 임포트
-from .parser import Parser
+from .parser import Parser, SPECIAL_WORDS
 from .embedder import TextEmbedder
 from .matcher import ToDoMatcher
+from .batcher import EmbeddingBatcher
+from .cache import EmbeddingCache
+from .user_dictionary import ensure_user_dictionary, load_words
 
 class NLPAgent:
-    def __init__(self):
+    def __init__(
+        self,
+        use_batcher: bool = False,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        artifact_dir: Optional[str] = None,
+        embed_backend: str = "torch",
+        user_dictionary_dir: Optional[str] = None,
+        user_words_path: Optional[str] = None,
+        categories_path: Optional[str] = None,
+    ):
+        """
+        Args:
+            use_batcher (bool): True이면 동시 요청의 임베딩 작업을 마이크로 배치로 묶어 처리합니다.
+            max_batch_size (int): 마이크로 배치당 최대 텍스트 수.
+            max_wait_ms (float): 마이크로 배치를 모으는 최대 대기 시간(ms).
+            embedding_cache (Optional[EmbeddingCache]): 설정하면 동일한 투두 텍스트의 임베딩을 재사용합니다.
+            artifact_dir (Optional[str]): 카테고리 행렬을 저장/로딩할 디렉터리.
+            embed_backend (str): 임베딩 추론 백엔드 ('torch', 'onnx', 'onnx-int8').
+            user_dictionary_dir (Optional[str]): 설정하면 SPECIAL_WORDS(+ user_words_path의 단어)를
+                MeCab 사용자 사전으로 컴파일하여 이 디렉터리에 저장하고 공용 MeCab에 로딩합니다.
+                컴파일에 실패하면 같은 단어 목록으로 Parser의 런타임 보정을 수행합니다.
+            user_words_path (Optional[str]): 사용자 사전에 추가할 단어 파일 (한 줄에 한 단어).
+            categories_path (Optional[str]): 카테고리/프로토타입 설정 파일. None이면 nlp_agent/categories.json.
+        """
+        words = list(SPECIAL_WORDS)
+        if user_words_path:
+            words += load_words(user_words_path)
+        user_dictionary_path = ensure_user_dictionary(words, user_dictionary_dir) if user_dictionary_dir else None
+
         # 파서, 임베더, 매처 인스턴스 생성
-        self.parser = Parser()
-        self.embedder = TextEmbedder()
-        self.matcher = ToDoMatcher(self.embedder)
+        self.parser = Parser(user_dictionary_path=user_dictionary_path, special_words=words)
+        self.embedder = TextEmbedder(cache=embedding_cache, backend=embed_backend)
+        self.matcher = ToDoMatcher(self.embedder, artifact_dir=artifact_dir, categories_path=categories_path)
+        self.batcher = (
+            EmbeddingBatcher(self.embedder, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+            if use_batcher else None
+        )
         print("\nNLPAgent 초기화 완료.")
 
+    def embed_batch(self, texts: List[str]):
+        """ 마이크로 배처가 켜져 있으면 배처를, 아니면 임베더를 직접 사용합니다. """
+        if self.batcher is not None:
+            return self.batcher.embed_batch(texts)
+        return self.embedder.embed_batch(texts)
+
     def process_text(self, text: str) -> List[Dict[str, Any]]:
         """
         입력 텍스트를 처리하여 TODO 항목들을 추출하고 임베딩 및 카테고리 할당을 수행합니다.
@@ -24,30 +68,50 @@ class NLPAgent:
         Returns:
             List[Dict[str, Any]]: 처리된 TODO 항목들의 리스트.
         """
+        return self.process_texts([text])[0]
+
+    def process_texts(self, texts: List[str], embedding_as_list: bool = True) -> List[List[Dict[str, Any]]]:
+        """
+        여러 입력 텍스트를 파싱한 뒤, 모든 TODO를 한 번의 배치로 임베딩하고 카테고리를 할당합니다.
+
+        Args:
+            texts (List[str]): 사용자의 자연어 입력 목록.
+            embedding_as_list (bool): False이면 'embedding'을 파이썬 리스트 대신 float32 numpy 배열로 담습니다.
+                (API 응답 직렬화처럼 배열에서 바로 인코딩할 때 리스트 변환 비용을 줄임)
+
+        Returns:
+            List[List[Dict[str, Any]]]: 입력 순서대로, 각 텍스트에서 처리된 TODO 항목 리스트.
+        """
         # 1단계: Parser를 통해 문장 분리 및 메타데이터 추출
-        parsed_todos = self.parser.parse_multiple_sentences(text)
+        results = [self.parser.parse_multiple_sentences(text) for text in texts]
+        parsed_todos = [todo_item for parsed in results for todo_item in parsed]
         
-        # 2단계: 각 TODO 항목에 대해 Embedder 및 Matcher 실행
+        # 2단계: 비어 있지 않은 TODO 텍스트를 모아 한 번에 임베딩 (N번의 forward pass -> 1번)
+        todo_texts = [todo_item.get('todo', '') for todo_item in parsed_todos]
+        valid_indices = [i for i, todo_text in enumerate(todo_texts) if todo_text]
+        embeddings = self.embed_batch([todo_texts[i] for i in valid_indices])
+
+        embedding_rows = embeddings.tolist() if embedding_as_list else embeddings.numpy()
+        empty_embedding = [] if embedding_as_list else np.empty(0, dtype=np.float32)
+
         for todo_item in parsed_todos:
-            todo_text = todo_item.get('todo', '')
-            if todo_text:
-                # 2-1단계: todo 텍스트를 임베더로 전달하여 임베딩만 생성
-                embed_result = self.embedder.embed_text(todo_text)
-                embedding = embed_result['embedding']
-                
-                # 2-2단계: 임베딩을 매처로 전달하여 카테고리 할당
-                assigned_category = self.matcher.match_category(embedding)
-                
-                # 변환된 텍스트, 임베딩, 카테고리를 결과에 추가
-                todo_item['simplified_text'] = todo_text # 파서의 결과를 그대로 사용
-                todo_item['embedding'] = embedding.squeeze().tolist()
-                todo_item['category'] = assigned_category
-            else:
-                todo_item['simplified_text'] = ''
-                todo_item['embedding'] = []
-                todo_item['category'] = '기타'
-
-        return parsed_todos
+            todo_item['simplified_text'] = ''
+            todo_item['embedding'] = empty_embedding
+            todo_item['category'] = '기타'
+            todo_item['category_confidence'] = 0.0
+
+        # 3단계: 임베딩 배치를 매처로 전달하여 한 번의 행렬곱으로 카테고리 할당
+        matches = self.matcher.match_categories(embeddings)
+        for row, idx in enumerate(valid_indices):
+            todo_item = parsed_todos[idx]
+
+            # 변환된 텍스트, 임베딩, 카테고리를 결과에 추가
+            todo_item['simplified_text'] = todo_texts[idx] # 파서의 결과를 그대로 사용
+            todo_item['embedding'] = embedding_rows[row]
+            todo_item['category'] = matches[row].category
+            todo_item['category_confidence'] = matches[row].confidence
+
+        return results
 
 if __name__ == "__main__":
     agent = NLPAgent()
@@ -61,7 +125,7 @@ if __name__ == "__main__":
     for idx, item in enumerate(final_result):
         print(f"** {idx + 1}. 원본 문장: '{item['original_sentence']}'")
         print(f"   - To-do (변환): '{item['simplified_text']}'")
-        print(f"   - 카테고리: '{item['category']}'")
+        print(f"   - 카테고리: '{item['category']}' (신뢰도 {item['category_confidence']:.2f})")
         print(f"   - 날짜: '{item['date']}'")
         print(f"   - 시간: '{item['time']}'")
         print("-" * 20)
\ No newline at end of file
@@ -0,0 +1,218 @@
+import argparse
+import os
+import threading
+from typing import Dict, Any, List, Optional
+
+import torch
+
+# ONNX Runtime은 선택 의존성입니다: pip install onnx onnxruntime
+ONNX_BACKENDS = ("onnx", "onnx-int8")
+
+
+def _require_onnxruntime():
+    try:
+        import onnxruntime
+    except ImportError as e:
+        raise ImportError(
+            "ONNX 백엔드를 사용하려면 onnxruntime이 필요합니다: pip install onnx onnxruntime"
+        ) from e
+    return onnxruntime
+
+
+def onnx_model_path(onnx_dir: str, model_name: str, backend: str) -> str:
+    """ 모델 이름/백엔드별 ONNX 파일 경로 """
+    base = model_name.replace("/", "__")
+    suffix = "-int8" if backend == "onnx-int8" else ""
+    return os.path.join(onnx_dir, f"{base}{suffix}.onnx")
+
+
+def _write_atomically(output_path: str, write) -> str:
+    """
+    write(tmp_path)로 프로세스별 임시 파일에 쓴 뒤 os.replace로 교체합니다.
+    중단된 내보내기가 잘린 .onnx 파일을 남겨 다음 기동 시 유효한 모델로 읽히는 일을 막습니다.
+    """
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return output_path
+
+
+def export_onnx(model_name: str, output_path: str) -> str:
+    """
+    Hugging Face 모델을 ONNX로 내보냅니다. 배치/시퀀스 길이는 동적 축으로 설정합니다.
+
+    Args:
+        model_name (str): Hugging Face 모델 이름.
+        output_path (str): 저장할 .onnx 파일 경로.
+
+    Returns:
+        str: 저장된 파일 경로.
+    """
+    from transformers import AutoTokenizer, AutoModel
+
+    print(f"ONNX 내보내기 중: {model_name} -> {output_path}")
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModel.from_pretrained(model_name)
+    model.eval()
+
+    sample = tokenizer(["헬스장 가기", "장보기"], padding=True, return_tensors="pt")
+    # forward 시그니처 순서(input_ids, attention_mask, token_type_ids)에 맞춰 위치 인자로 전달
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    def write(path):
+        with torch.no_grad():
+            torch.onnx.export(
+                model,
+                args=tuple(sample[name] for name in input_names),
+                f=path,
+                input_names=input_names,
+                output_names=["last_hidden_state"],
+                dynamic_axes=dynamic_axes,
+                opset_version=17,
+            )
+
+    _write_atomically(output_path, write)
+    print("ONNX 내보내기 완료.")
+    return output_path
+
+
+def quantize_int8(fp32_path: str, output_path: str) -> str:
+    """ ONNX 모델의 가중치를 동적 INT8 양자화합니다. """
+    _require_onnxruntime()
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+
+    print(f"INT8 동적 양자화 중: {fp32_path} -> {output_path}")
+    _write_atomically(output_path, lambda path: quantize_dynamic(fp32_path, path, weight_type=QuantType.QInt8))
+    print("INT8 양자화 완료.")
+    return output_path
+
+
+def ensure_onnx_model(model_name: str, backend: str, onnx_dir: str) -> str:
+    """ 필요한 ONNX 파일이 없으면 내보내기/양자화를 수행하고 경로를 반환합니다. """
+    fp32_path = onnx_model_path(onnx_dir, model_name, "onnx")
+    if not os.path.exists(fp32_path):
+        export_onnx(model_name, fp32_path)
+    if backend == "onnx":
+        return fp32_path
+
+    int8_path = onnx_model_path(onnx_dir, model_name, "onnx-int8")
+    if not os.path.exists(int8_path):
+        quantize_int8(fp32_path, int8_path)
+    return int8_path
+
+
+class OnnxEncoder:
+    def __init__(self, model_path: str, model_name: str, num_threads: Optional[int] = None):
+        """
+        ONNX Runtime 세션을 AutoModel과 같은 호출 방식으로 감쌉니다.
+        (self.model(**encoded_input)[0] 이 토큰 임베딩이 되도록)
+
+        세션은 첫 호출 시 프로세스별로 생성합니다. ONNX Runtime 세션은 fork 이후 사용을 지원하지 않으므로,
+        gunicorn 마스터에서 만들어진 인코더를 물려받은 워커는 자기 세션을 새로 만듭니다.
+
+        Args:
+            model_path (str): .onnx 파일 경로.
+            model_name (str): 설정(hidden_size 등)을 읽어올 Hugging Face 모델 이름.
+            num_threads (Optional[int]): intra-op 스레드 수. None이면 세션 생성 시점의 torch.get_num_threads()
+                (gunicorn 워커에서는 post_fork가 설정한 TORCH_THREADS_PER_WORKER), 0이면 ONNX Runtime 기본값.
+        """
+        _require_onnxruntime()
+        from transformers import AutoConfig
+
+        self.model_path = model_path
+        self.num_threads = num_threads
+        self.config = AutoConfig.from_pretrained(model_name)
+
+        self._session = None
+        self._session_pid = None
+        self._session_lock = threading.Lock()
+        self.input_names = set()
+
+    @property
+    def session(self):
+        if self._session is not None and self._session_pid == os.getpid():
+            return self._session
+        with self._session_lock:
+            if self._session is None or self._session_pid != os.getpid():
+                ort = _require_onnxruntime()
+                options = ort.SessionOptions()
+                num_threads = torch.get_num_threads() if self.num_threads is None else self.num_threads
+                if num_threads:
+                    options.intra_op_num_threads = num_threads
+                options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+                session = ort.InferenceSession(self.model_path, options, providers=["CPUExecutionProvider"])
+                self.input_names = {i.name for i in session.get_inputs()}
+                self._session, self._session_pid = session, os.getpid()
+        return self._session
+
+    def __call__(self, **encoded_input):
+        session = self.session
+        feeds = {
+            name: tensor.cpu().numpy()
+            for name, tensor in encoded_input.items()
+            if name in self.input_names
+        }
+        last_hidden_state = session.run(["last_hidden_state"], feeds)[0]
+        return (torch.from_numpy(last_hidden_state),)
+
+
+def compare_backends(
+    model_name: str, backends: List[str], onnx_dir: str, texts: List[str]
+) -> Dict[str, Any]:
+    """
+    fp32 PyTorch 임베딩을 기준으로 각 백엔드의 코사인 유사도와 카테고리 일치율을 측정합니다.
+    """
+    from .embedder import TextEmbedder
+    from .matcher import ToDoMatcher
+
+    reference = TextEmbedder(model_name)
+    reference_matcher = ToDoMatcher(reference)
+    reference_embeddings = reference.embed_batch(texts)
+    reference_categories = [m.category for m in reference_matcher.match_categories(reference_embeddings)]
+
+    report = {}
+    for backend in backends:
+        candidate = TextEmbedder(model_name, backend=backend, onnx_dir=onnx_dir)
+        candidate_matcher = ToDoMatcher(candidate)
+        candidate_embeddings = candidate.embed_batch(texts)
+        candidate_categories = [m.category for m in candidate_matcher.match_categories(candidate_embeddings)]
+
+        cosine = (reference_embeddings * candidate_embeddings).sum(dim=1)
+        agreement = sum(a == b for a, b in zip(reference_categories, candidate_categories)) / len(texts)
+        report[backend] = {
+            "cosine_min": round(cosine.min().item(), 4),
+            "cosine_mean": round(cosine.mean().item(), 4),
+            "category_agreement": round(agreement, 4),
+        }
+    return report
+
+
+SAMPLE_TEXTS = [
+    "헬스장 가기", "운동하기", "장보기", "영어 단어 암기", "보고서 작성하기",
+    "설거지하기", "친구 만나기", "두부 사기", "경찰서 가기", "점메추 받기",
+    "파이썬 강의 듣기", "회의 참석하기", "빨래하기", "산책하기", "엽떡 먹기",
+]
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="ONNX/INT8 임베딩 백엔드 내보내기 및 정확도 점검")
+    arg_parser.add_argument("--model", default="jhgan/ko-sroberta-multitask")
+    arg_parser.add_argument("--onnx-dir", default=".cache/onnx")
+    arg_parser.add_argument("--backends", nargs="+", default=list(ONNX_BACKENDS), choices=ONNX_BACKENDS)
+    args = arg_parser.parse_args()
+
+    for backend_name in args.backends:
+        print(f"준비 완료: {ensure_onnx_model(args.model, backend_name, args.onnx_dir)}")
+
+    results = compare_backends(args.model, args.backends, args.onnx_dir, SAMPLE_TEXTS)
+    print("\n--- fp32 대비 정확도 ---")
+    for backend_name, metrics in results.items():
+        print(f"{backend_name}: {metrics}")
@@ -1,21 +1,48 @@
 import re
 import json
-from typing import Dict, Any, List
-from mecab import MeCab
+from typing import Dict, Any, List, Iterator, Tuple, Optional
 from datetime import datetime, timedelta
 import os
 
+from .aho_corasick import AhoCorasick
+from .tagger import get_tagger_provider
+
+# Mecab이 잘못 분리하는 신조어/복합 명사
+SPECIAL_WORDS = [
+    "엽떡", "짜파구리", "맞담", "인강", "쿠팡", "배민", "요기요", "로제", "혼술",
+    "혼밥", "소확행", "퇴근길", "출근길", "점메추", "아아", "아메", "아카",
+    "아카페라", "카페라떼", "카페모카", "카모", "카모카", "헬스장", "교촌치킨", 
+    "포트폴리오", "채용공고", "경찰서" # 복합 명사 추가 유지
+]
+
 class Parser:
-    def __init__(self):
-        self.tokenizer = MeCab()
-        print("Parser 초기화 완료: Mecab 엔진 사용")
-
-        self.special_words = [
-            "엽떡", "짜파구리", "맞담", "인강", "쿠팡", "배민", "요기요", "로제", "혼술",
-            "혼밥", "소확행", "퇴근길", "출근길", "점메추", "아아", "아메", "아카",
-            "아카페라", "카페라떼", "카페모카", "카모", "카모카", "헬스장", "교촌치킨", 
-            "포트폴리오", "채용공고", "경찰서" # 복합 명사 추가 유지
-        ]
+    def __init__(self, user_dictionary_path: Optional[str] = None, special_words: Optional[List[str]] = None):
+        """
+        Args:
+            user_dictionary_path (Optional[str]): special_words를 컴파일한 MeCab 사용자 사전(.dic) 경로.
+                설정하면 MeCab이 신조어를 한 토큰으로 태깅하므로 문장별 보정 과정을 건너뜁니다.
+            special_words (Optional[List[str]]): 한 토큰으로 보호할 신조어 목록. None이면 SPECIAL_WORDS.
+        """
+        self.user_dictionary_path = user_dictionary_path
+        # 패키지 공용 MeCab 제공자 (모든 스레드가 잠금으로 직렬화된 인스턴스 하나를 공유, 첫 사용 시 생성)
+        self.tagger_provider = get_tagger_provider(user_dictionary_path)
+        if user_dictionary_path:
+            print(f"Parser 초기화 완료: Mecab 엔진 사용 (사용자 사전: {user_dictionary_path})")
+        else:
+            print("Parser 초기화 완료: Mecab 엔진 사용")
+
+        self.special_words = list(dict.fromkeys(special_words if special_words is not None else SPECIAL_WORDS))
+
+        # special_words 매칭용 오토마톤과 Mecab 분할형 -> 원형 테이블을 한 번만 생성
+        # (사용자 사전이 있으면 MeCab이 직접 처리하므로 런타임 보정은 생략)
+        self._special_matcher = AhoCorasick([] if user_dictionary_path else self.special_words)
+        self._special_morph_table = []
+        for word in self.special_words:
+            if ' ' in word:
+                continue
+            split_word = " ".join(self.tokenizer.morphs(word))
+            if split_word != word:
+                self._special_morph_table.append((split_word, word))
 
         # 문장 분리 기준 품사/토큰 목록
         self.SPLIT_TOKENS = {
@@ -30,6 +57,17 @@ class Parser:
             "되니", "되서", "되고", "돼" 
         ]
 
+        # 분리 정규식은 한 번만 컴파일하고, 분리 토큰 판별은 집합 조회로 처리
+        split_tokens_pattern = '|'.join(map(re.escape, self.SPLIT_TEXTS))
+        self._split_regex = re.compile(r'(' + split_tokens_pattern + r'|\s*[.,?!]\s*)')
+        self._splitter_set = frozenset(self.SPLIT_TEXTS) | frozenset(".,?!")
+        self._split_text_set = frozenset(self.SPLIT_TEXTS)
+
+    @property
+    def tokenizer(self):
+        """ 모든 스레드가 공유하는 MeCab 인스턴스 (호출마다 잠금으로 직렬화) """
+        return self.tagger_provider.get()
+
     # --- 유틸리티 메서드 추가 ---
     def _get_verb_root(self, token: str) -> str:
                 """ 동사 토큰에서 어미를 제거하고 원형을 추출하는 휴리스틱 """
@@ -66,34 +104,37 @@ class Parser:
         """ 
         입력 텍스트를 띄어쓰기를 최대한 보존하며 문장 분리 기준에 따라 나눕니다.
         """
-        
-        split_tokens_pattern = '|'.join(map(re.escape, self.SPLIT_TEXTS))
-        split_pattern_regex = r'(' + split_tokens_pattern + r'|\s*[.,?!]\s*)'
+        return list(self.iter_sentences(text))
 
-        sentences_and_splitters = re.split(split_pattern_regex, text)
-        
-        cleaned_sentences = []
+    def iter_sentences(self, text: str) -> Iterator[str]:
+        """
+        _split_sentences의 스트리밍 버전. 중간 리스트를 만들지 않고 문장을 하나씩 생성합니다.
+        수 KB 이상의 긴 받아쓰기 텍스트도 일정한 메모리로 분리할 수 있습니다.
+        """
         current_sentence = ""
+        position = 0
 
-        for part in sentences_and_splitters:
-            if part is None or not part.strip():
-                continue
-            
-            is_splitter = any(part.strip() == t for t in self.SPLIT_TEXTS) or re.match(r'^\s*[.,?!]\s*$', part.strip())
-            
-            if is_splitter:
+        for match in self._split_regex.finditer(text):
+            # 분리 토큰 앞의 조각은 현재 문장에 이어 붙임
+            current_sentence = self._append_fragment(current_sentence, text[position:match.start()])
+            position = match.end()
+
+            if match.group().strip() in self._splitter_set:
                 if current_sentence.strip():
-                    cleaned_sentences.append(current_sentence.strip())
+                    yield current_sentence.strip()
                 current_sentence = ""
-            else:
-                if current_sentence and not current_sentence.endswith(' ') and not part.startswith(' '):
-                     current_sentence += ' ' 
-                current_sentence += part
 
+        current_sentence = self._append_fragment(current_sentence, text[position:])
         if current_sentence.strip():
-            cleaned_sentences.append(current_sentence.strip())
-            
-        return [s for s in cleaned_sentences if s]
+            yield current_sentence.strip()
+
+    @staticmethod
+    def _append_fragment(current_sentence: str, part: str) -> str:
+        if not part.strip():
+            return current_sentence
+        if current_sentence and not current_sentence.endswith(' ') and not part.startswith(' '):
+            current_sentence += ' '
+        return current_sentence + part
 
 
     def _get_absolute_date(self, relative_date: str) -> str:
@@ -122,26 +163,50 @@ class Parser:
         else:
             return relative_date
 
+    def _pos_with_special_words(self, sentence: str) -> List[Tuple[str, str]]:
+        """
+        문장을 한 번만 태깅하고, special_words 구간에 속한 형태소들은 하나의 (단어, "NNG") 토큰으로 합칩니다.
+        형태소 경계가 special_words 경계와 어긋나는 드문 경우에만 구간별로 다시 태깅합니다.
+        """
+        spans = self._special_matcher.find_spans(sentence)
+        if not spans:
+            return self.tokenizer.pos(sentence)
+
+        tokens = []
+        span_index = 0
+        for morpheme in self.tokenizer.parse(sentence):
+            start, end = morpheme.span
+            while span_index < len(spans) and spans[span_index][1] <= start:
+                span_index += 1
+
+            if span_index < len(spans) and spans[span_index][0] < end:
+                span_start, span_end = spans[span_index]
+                if start < span_start or end > span_end:
+                    return self._pos_by_segments(sentence, spans)
+                if start == span_start:
+                    tokens.append((sentence[span_start:span_end], "NNG"))
+                continue
+
+            if morpheme.surface.strip():
+                tokens.append((morpheme.surface, morpheme.pos))
+        return tokens
+
+    def _pos_by_segments(self, sentence: str, spans: List[Tuple[int, int]]) -> List[Tuple[str, str]]:
+        """ special_words 구간 사이의 조각만 따로 태깅합니다. """
+        tokens = []
+        position = 0
+        for start, end in spans:
+            tokens.extend(self.tokenizer.pos(sentence[position:start]))
+            tokens.append((sentence[start:end], "NNG"))
+            position = end
+        tokens.extend(self.tokenizer.pos(sentence[position:]))
+        return [(t, p) for t, p in tokens if t.strip()]
+
     def _parse_single_sentence(self, sentence: str) -> Dict[str, Any]:
         print(f"\n[STEP 1] 원본 문장: '{sentence}'")
 
-        # 1. 신조어 처리 후 Mecab 품사 태깅 
-        parsed_tokens = self.tokenizer.pos(sentence)
-        for word in self.special_words:
-            if word in sentence:
-                processed_tokens = []
-                current_text = sentence
-                while word in current_text:
-                    pre_word_text, post_word_text = current_text.split(word, 1)
-                    
-                    processed_tokens.extend(self.tokenizer.pos(pre_word_text))
-                    processed_tokens.append((word, "NNG"))
-                    current_text = post_word_text
-                
-                processed_tokens.extend(self.tokenizer.pos(current_text))
-                
-                parsed_tokens = [(t, p) for t, p in processed_tokens if t.strip()]
-                break # 첫 번째 특수 단어만 처리
+        # 1. 신조어 처리 후 Mecab 품사 태깅 (문장당 한 번, 모든 special_words 구간 보호)
+        parsed_tokens = self._pos_with_special_words(sentence)
 
         print(f"[STEP 2] Mecab 품사 태깅 결과: {parsed_tokens}")
 
@@ -260,12 +325,8 @@ class Parser:
         
         # 🚨 FIX 3: special_words에 있는 단어는 붙여서 나오도록 처리
         temp_noun_phrase = " ".join(todo_parts)
-        for word in self.special_words:
+        for split_word, word in self._special_morph_table:
             # Mecab이 쪼갠 명사를 다시 붙인다 (예: "점 메추" -> "점메추")
-            if ' ' in word: 
-                 continue
-                 
-            split_word = " ".join(self.tokenizer.morphs(word))
             temp_noun_phrase = temp_noun_phrase.replace(split_word, word)
 
         todo_parts = [p for p in temp_noun_phrase.split(" ") if p]
@@ -305,18 +366,16 @@ class Parser:
 
     def parse_multiple_sentences(self, text: str) -> List[Dict[str, Any]]:
         print(f"전체 입력 텍스트: '{text}'")
-        sentences = self._split_sentences(text) 
-
         parsed_results = []
         last_known_date = datetime.today().strftime("%Y-%m-%d")
 
-        for sentence in sentences:
+        for sentence in self.iter_sentences(text):
             if not sentence:
                 continue
 
             result = self._parse_single_sentence(sentence)
 
-            if result["todo"] in self.SPLIT_TEXTS or result["todo"] in ["고", "그리고"]:
+            if result["todo"] in self._split_text_set or result["todo"] in ["고", "그리고"]:
                  print(f"⚠️ 분리 토큰 필터링: {result['todo']}")
                  continue
 
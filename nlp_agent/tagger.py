@@ -0,0 +1,79 @@
+import threading
+import time
+from typing import Dict, Any, Optional
+
+from mecab import MeCab
+
+
+class _LockedTagger:
+    """ 공유 MeCab 인스턴스의 메서드 호출(pos, morphs, parse 등)을 하나의 잠금으로 직렬화하는 래퍼 """
+
+    def __init__(self, tagger: MeCab, lock: threading.Lock):
+        self._tagger = tagger
+        self._lock = lock
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._tagger, name)
+        if not callable(attr):
+            return attr
+
+        def locked(*args, **kwargs):
+            with self._lock:
+                return attr(*args, **kwargs)
+
+        return locked
+
+
+class TaggerProvider:
+    def __init__(self, user_dictionary_path: Optional[str] = None):
+        """
+        nlp_agent 패키지 전체에서 공유하는 MeCab 제공자.
+        사전은 프로세스당 한 번만 로딩하고, MeCab Tagger는 재진입이 보장되지 않으므로
+        호출을 잠금으로 직렬화합니다. 형태소 분석은 문장당 수십 µs 수준이라 임베딩보다 훨씬 짧아,
+        스레드 수만큼 사전 메모리를 늘리는 것보다 잠금 대기를 감수하는 편이 낫습니다.
+
+        Args:
+            user_dictionary_path (Optional[str]): MeCab 사용자 사전(.dic) 경로.
+        """
+        self.user_dictionary_path = user_dictionary_path
+        self._lock = threading.Lock()
+        self._call_lock = threading.Lock()
+        self._tagger: Optional[_LockedTagger] = None
+        self._load_seconds: Optional[float] = None
+
+    def get(self) -> MeCab:
+        """ 공유 MeCab 인스턴스(호출이 직렬화되는 래퍼)를 반환합니다. 처음 호출되면 사전을 로딩합니다. """
+        if self._tagger is not None:
+            return self._tagger
+        with self._lock:
+            if self._tagger is None:
+                started = time.perf_counter()
+                if self.user_dictionary_path:
+                    tagger = MeCab(user_dictionary_path=self.user_dictionary_path)
+                else:
+                    tagger = MeCab()
+                self._load_seconds = time.perf_counter() - started
+                self._tagger = _LockedTagger(tagger, self._call_lock)
+        return self._tagger
+
+    def metrics(self) -> Dict[str, Any]:
+        """ 생성된 인스턴스 수와 사전 로딩 시간(ms) 메트릭을 반환합니다. """
+        return {
+            "user_dictionary_path": self.user_dictionary_path,
+            "instances": 1 if self._tagger is not None else 0,
+            "load_ms": round(self._load_seconds * 1000, 2) if self._load_seconds is not None else None,
+        }
+
+
+_providers: Dict[Optional[str], TaggerProvider] = {}
+_providers_lock = threading.Lock()
+
+
+def get_tagger_provider(user_dictionary_path: Optional[str] = None) -> TaggerProvider:
+    """ 사용자 사전 경로별로 하나의 TaggerProvider를 공유합니다. """
+    with _providers_lock:
+        provider = _providers.get(user_dictionary_path)
+        if provider is None:
+            provider = TaggerProvider(user_dictionary_path)
+            _providers[user_dictionary_path] = provider
+        return provider
@@ -0,0 +1,92 @@
+import hashlib
+import os
+import subprocess
+import sys
+from typing import List, Optional, Iterable
+
+
+def _has_final_consonant(word: str) -> str:
+    """ 마지막 글자의 받침 유무 (mecab-ko-dic의 '종성유무' 필드: T/F/*) """
+    last = word[-1]
+    if "가" <= last <= "힣":
+        return "T" if (ord(last) - ord("가")) % 28 else "F"
+    return "*"
+
+
+def load_words(path: str) -> List[str]:
+    """ 한 줄에 한 단어씩 적힌 파일을 읽습니다. 빈 줄과 '#' 주석은 무시합니다. """
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+def write_user_dictionary_csv(words: Iterable[str], csv_path: str, cost: int = 0) -> str:
+    """
+    단어 목록을 mecab-ko-dic 사용자 사전 CSV로 저장합니다. 모든 단어는 일반 명사(NNG)로 등록합니다.
+    좌/우 문맥 ID는 비워 두면 mecab-dict-index가 자동으로 할당합니다.
+    """
+    with open(csv_path, "w", encoding="utf-8") as f:
+        for word in dict.fromkeys(w.strip() for w in words):
+            if not word or "," in word:
+                continue
+            f.write(f"{word},,,{cost},NNG,*,{_has_final_consonant(word)},{word},*,*,*,*\n")
+    return csv_path
+
+
+def _system_dictionary_path() -> str:
+    import mecab_ko_dic
+
+    for attribute in ("dictionary_path", "DICDIR"):
+        path = getattr(mecab_ko_dic, attribute, None)
+        if path:
+            return str(path)
+    return os.path.join(os.path.dirname(mecab_ko_dic.__file__), "dictionary")
+
+
+def _dict_index_command() -> List[str]:
+    """
+    사전 컴파일 명령. 기본값은 python-mecab-ko에 포함된 `python -m mecab dict-index`이며,
+    MECAB_DICT_INDEX 환경 변수로 별도 설치한 mecab-dict-index 실행 파일을 지정할 수 있습니다.
+    """
+    binary = os.getenv("MECAB_DICT_INDEX")
+    return [binary] if binary else [sys.executable, "-m", "mecab", "dict-index"]
+
+
+def compile_user_dictionary(csv_path: str, output_path: str) -> str:
+    """
+    mecab-dict-index로 사용자 사전 CSV를 .dic 파일로 컴파일합니다.
+    """
+    subprocess.run(
+        _dict_index_command()
+        + ["-d", _system_dictionary_path(), "-u", output_path, "-f", "utf-8", "-t", "utf-8", csv_path],
+        check=True,
+        capture_output=True,
+    )
+    return output_path
+
+
+def ensure_user_dictionary(words: Iterable[str], output_dir: str) -> Optional[str]:
+    """
+    단어 목록으로 사용자 사전을 만들고 경로를 반환합니다. 같은 단어 목록이면 이미 컴파일된 파일을 재사용합니다.
+    컴파일할 수 없는 환경이면 None을 반환하며, 이 경우 Parser는 기존 special_words 보정 방식으로 동작합니다.
+    """
+    words = list(dict.fromkeys(words))
+    fingerprint = hashlib.sha256("\n".join(words).encode("utf-8")).hexdigest()[:16]
+    dic_path = os.path.join(output_dir, f"user-{fingerprint}.dic")
+    if os.path.exists(dic_path):
+        return dic_path
+
+    os.makedirs(output_dir, exist_ok=True)
+    csv_path = os.path.join(output_dir, f"user-{fingerprint}.csv")
+    write_user_dictionary_csv(words, csv_path)
+    # 여러 워커가 동시에 컴파일해도 서로의 파일을 덮어쓰지 않도록 프로세스별 임시 파일에 쓴 뒤 교체
+    tmp_path = f"{dic_path}.{os.getpid()}.tmp"
+    try:
+        compile_user_dictionary(csv_path, tmp_path)
+    except (ImportError, subprocess.CalledProcessError, OSError) as e:
+        print(f"⚠️ 사용자 사전 컴파일 실패, special_words 보정 방식 사용: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return None
+    os.replace(tmp_path, dic_path)
+    print(f"사용자 사전 생성 완료: {dic_path} ({len(words)}개 단어)")
+    return dic_path
@@ -0,0 +1,340 @@
+import fcntl
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+
+
+INDEX_BACKENDS = ("flat", "ivf")
+
+
+class VectorSearchResult(NamedTuple):
+    id: int
+    score: float
+    item: Dict[str, Any]
+
+
+class FlatSearch:
+    """ 파티션 전체와 한 번의 행렬곱으로 정확한 top-k를 찾는 백엔드 """
+
+    def update(self, matrix: np.ndarray):
+        pass
+
+    def candidates(self, matrix: np.ndarray, query: np.ndarray) -> Optional[np.ndarray]:
+        return None
+
+
+class IVFSearch:
+    def __init__(self, n_lists: int = 32, n_probe: int = 4, min_train_size: int = 1024, n_iter: int = 10):
+        """
+        k-means 중심으로 벡터를 n_lists개의 목록으로 나누고, 질의와 가까운 n_probe개 목록만 검사하는 근사 백엔드.
+        벡터 수가 min_train_size 미만이면 전수 검색과 같게 동작하며,
+        학습 이후 추가된 벡터는 가장 가까운 목록에 배정하고 벡터 수가 두 배가 되면 다시 학습합니다.
+        """
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.min_train_size = min_train_size
+        self.n_iter = n_iter
+
+        self.centroids: Optional[np.ndarray] = None
+        self.assignments = np.empty(0, dtype=np.int32)
+        self.trained_size = 0
+
+    def _train(self, matrix: np.ndarray):
+        # 정규화된 벡터에 대한 구면 k-means (재현 가능하도록 시드 고정)
+        rng = np.random.default_rng(0)
+        n_lists = min(self.n_lists, len(matrix))
+        centroids = np.array(matrix[rng.choice(len(matrix), n_lists, replace=False)], dtype=np.float32)
+        for _ in range(self.n_iter):
+            assignments = (matrix @ centroids.T).argmax(axis=1)
+            for c in range(n_lists):
+                members = matrix[assignments == c]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    centroids[c] = centroid / max(np.linalg.norm(centroid), 1e-12)
+        self.centroids = centroids
+        self.assignments = (matrix @ centroids.T).argmax(axis=1).astype(np.int32)
+        self.trained_size = len(matrix)
+
+    def update(self, matrix: np.ndarray):
+        if len(matrix) < self.min_train_size:
+            return
+        if self.centroids is None or len(matrix) >= 2 * self.trained_size:
+            self._train(matrix)
+            return
+        new_rows = matrix[len(self.assignments):]
+        if len(new_rows):
+            new_assignments = (new_rows @ self.centroids.T).argmax(axis=1).astype(np.int32)
+            self.assignments = np.concatenate([self.assignments, new_assignments])
+
+    def candidates(self, matrix: np.ndarray, query: np.ndarray) -> Optional[np.ndarray]:
+        if self.centroids is None:
+            return None
+        probe = np.argsort(-(self.centroids @ query))[: self.n_probe]
+        return np.flatnonzero(np.isin(self.assignments, probe))
+
+
+class _UserPartition:
+    def __init__(self, dim: int, path: Optional[str], search_backend):
+        """
+        한 사용자의 벡터와 항목 메타데이터.
+        path가 있으면 vectors.f32(행 단위 float32 추가 기록)와 items.jsonl에 저장하고 벡터는 mmap으로 읽습니다.
+        추가/검색(파일 다시 읽기, IVF 재학습 포함)은 파티션별 잠금으로 직렬화하므로 다른 사용자의 요청을 막지 않습니다.
+        """
+        self.dim = dim
+        self.path = path
+        self.search_backend = search_backend
+        self._lock = threading.Lock()
+
+        self.items: List[Dict[str, Any]] = []
+        self._buffer = np.empty((0, dim), dtype=np.float32)
+        self._count = 0
+        self._items_offset = 0
+
+        if self.path:
+            os.makedirs(self.path, exist_ok=True)
+            self.refresh()
+
+    @property
+    def vectors_path(self) -> str:
+        return os.path.join(self.path, "vectors.f32")
+
+    @property
+    def items_path(self) -> str:
+        return os.path.join(self.path, "items.jsonl")
+
+    @property
+    def matrix(self) -> np.ndarray:
+        return self._buffer[: self._count]
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool):
+        # 여러 워커 프로세스가 같은 파티션 파일에 추가할 때 벡터와 메타데이터 순서를 맞추기 위한 잠금
+        with open(os.path.join(self.path, ".lock"), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def refresh(self):
+        """ 다른 프로세스가 추가한 행이 있으면 파일을 다시 mmap하고 새 메타데이터를 읽습니다. """
+        if not os.path.exists(self.vectors_path):
+            return
+        row_bytes = self.dim * 4
+        with self._file_lock(exclusive=False):
+            count = os.path.getsize(self.vectors_path) // row_bytes
+            if count == self._count:
+                return
+            with open(self.items_path, "rb") as f:
+                f.seek(self._items_offset)
+                for line in f:
+                    if len(self.items) >= count:
+                        break
+                    self.items.append(json.loads(line))
+                    self._items_offset += len(line)
+        count = min(count, len(self.items))
+        self._buffer = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(count, self.dim))
+        self._count = count
+        self.search_backend.update(self.matrix)
+
+    def add(self, vectors: np.ndarray, items: List[Dict[str, Any]]) -> List[int]:
+        with self._lock:
+            return self._add(vectors, items)
+
+    def _add(self, vectors: np.ndarray, items: List[Dict[str, Any]]) -> List[int]:
+        if self.path:
+            with self._file_lock(exclusive=True):
+                with open(self.vectors_path, "ab") as f:
+                    # 다른 프로세스가 먼저 추가했을 수 있으므로 ID는 현재 파일 끝 위치 기준
+                    start = f.tell() // (self.dim * 4)
+                    f.write(vectors.tobytes())
+                with open(self.items_path, "ab") as f:
+                    f.write(b"".join(json.dumps(item, ensure_ascii=False).encode("utf-8") + b"\n" for item in items))
+            self.refresh()
+            return list(range(start, start + len(items)))
+
+        # 메모리 전용: 용량을 두 배씩 늘려 추가 비용을 상각
+        start = self._count
+        needed = start + len(vectors)
+        if needed > len(self._buffer):
+            grown = np.empty((max(needed, 2 * len(self._buffer), 64), self.dim), dtype=np.float32)
+            grown[:start] = self._buffer[:start]
+            self._buffer = grown
+        self._buffer[start:needed] = vectors
+        self._count = needed
+        self.items.extend(items)
+        self.search_backend.update(self.matrix)
+        return list(range(start, needed))
+
+    def search(self, query: np.ndarray, k: int, exclude_ids: Iterable[int] = ()) -> List[VectorSearchResult]:
+        with self._lock:
+            return self._search(query, k, exclude_ids)
+
+    def _search(self, query: np.ndarray, k: int, exclude_ids: Iterable[int] = ()) -> List[VectorSearchResult]:
+        if self.path:
+            self.refresh()
+        matrix = self.matrix
+        if not len(matrix):
+            return []
+
+        candidate_ids = self.search_backend.candidates(matrix, query)
+        if candidate_ids is None:
+            scores = matrix @ query
+            candidate_ids = np.arange(len(matrix))
+        else:
+            scores = matrix[candidate_ids] @ query
+
+        exclude_ids = np.fromiter(exclude_ids, dtype=np.int64)
+        if len(exclude_ids):
+            keep = ~np.isin(candidate_ids, exclude_ids)
+            candidate_ids, scores = candidate_ids[keep], scores[keep]
+
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            VectorSearchResult(int(candidate_ids[i]), float(scores[i]), self.items[candidate_ids[i]])
+            for i in top
+        ]
+
+
+class TodoVectorIndex:
+    def __init__(
+        self,
+        index_dir: Optional[str] = None,
+        backend: str = "flat",
+        n_lists: int = 32,
+        n_probe: int = 4,
+        min_train_size: int = 1024,
+    ):
+        """
+        사용자별로 분할된 프로세스 내 할 일 벡터 인덱스.
+        같은 사용자의 벡터만 검색하므로 중복 할 일 감지와 유사 할 일 조회를 외부 벡터 DB 없이 처리합니다.
+
+        Args:
+            index_dir (Optional[str]): 파티션 파일을 저장할 디렉터리. None이면 메모리에만 보관합니다.
+            backend (str): 'flat'(정확한 전수 검색) 또는 'ivf'(근사 검색).
+            n_lists (int): IVF 목록 수.
+            n_probe (int): IVF 검색 시 검사할 목록 수.
+            min_train_size (int): 사용자별 벡터가 이 수 이상일 때부터 IVF를 학습합니다.
+        """
+        if backend not in INDEX_BACKENDS:
+            raise ValueError(f"지원하지 않는 인덱스 백엔드입니다: {backend} (가능한 값: {INDEX_BACKENDS})")
+        self.index_dir = index_dir
+        self.backend = backend
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.min_train_size = min_train_size
+
+        self.dim: Optional[int] = None
+        self._partitions: Dict[str, _UserPartition] = {}
+        self._lock = threading.Lock()
+
+        if self.index_dir:
+            os.makedirs(self.index_dir, exist_ok=True)
+            self._load_meta()
+
+    def _load_meta(self):
+        # 다른 워커가 먼저 첫 벡터를 저장했을 수 있으므로 차원을 모를 때마다 다시 확인
+        meta_path = os.path.join(self.index_dir, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, "r", encoding="utf-8") as f:
+                self.dim = json.load(f)["dim"]
+
+    def _make_search_backend(self):
+        if self.backend == "ivf":
+            return IVFSearch(self.n_lists, self.n_probe, self.min_train_size)
+        return FlatSearch()
+
+    def _ensure_dim(self, dim: int):
+        if self.dim is None and self.index_dir:
+            self._load_meta()
+        if self.dim is None:
+            self.dim = dim
+            if self.index_dir:
+                with open(os.path.join(self.index_dir, "meta.json"), "w", encoding="utf-8") as f:
+                    json.dump({"dim": dim}, f)
+        elif self.dim != dim:
+            raise ValueError(f"임베딩 차원이 인덱스와 다릅니다: {dim} != {self.dim}")
+
+    def _partition(self, user_id: str, create: bool) -> Optional[_UserPartition]:
+        partition = self._partitions.get(user_id)
+        if partition is not None:
+            return partition
+
+        path = None
+        if self.index_dir:
+            # 사용자 ID를 그대로 경로에 쓰지 않도록 해시로 디렉터리 이름을 만듦
+            path = os.path.join(self.index_dir, hashlib.sha256(user_id.encode("utf-8")).hexdigest()[:32])
+            if not create and not os.path.exists(path):
+                return None
+        elif not create:
+            return None
+
+        partition = _UserPartition(self.dim, path, self._make_search_backend())
+        self._partitions[user_id] = partition
+        return partition
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return np.ascontiguousarray(vectors / np.maximum(norms, 1e-12))
+
+    def add(self, user_id: str, vectors, items: List[Dict[str, Any]]) -> List[int]:
+        """
+        사용자 파티션에 벡터와 메타데이터를 추가합니다. 기존 벡터는 다시 계산하지 않습니다.
+
+        Args:
+            user_id (str): 사용자 ID.
+            vectors: (N, dim) 임베딩.
+            items (List[Dict[str, Any]]): 각 벡터의 메타데이터 (JSON 직렬화 가능).
+
+        Returns:
+            List[int]: 파티션 내에서 부여된 항목 ID.
+        """
+        vectors = self._normalize(np.atleast_2d(vectors))
+        if len(vectors) != len(items):
+            raise ValueError("벡터 수와 항목 수가 다릅니다.")
+        if not len(items):
+            return []
+        # 인덱스 잠금은 차원/파티션 목록에만 쓰고, 추가 자체는 파티션 잠금 안에서 수행
+        with self._lock:
+            self._ensure_dim(vectors.shape[1])
+            partition = self._partition(user_id, create=True)
+        return partition.add(vectors, items)
+
+    def search(self, user_id: str, vector, k: int = 5, exclude_ids: Iterable[int] = ()) -> List[VectorSearchResult]:
+        """
+        사용자 파티션에서 코사인 유사도가 높은 순으로 k개의 항목을 찾습니다.
+        exclude_ids에 있는 항목(예: 방금 추가한 질의 자신)은 결과에서 제외합니다.
+
+        Returns:
+            List[VectorSearchResult]: (id, score, item) 목록. 사용자 기록이 없으면 빈 목록입니다.
+        """
+        query = self._normalize(np.asarray(vector).reshape(-1))
+        with self._lock:
+            if self.dim is None and self.index_dir:
+                self._load_meta()
+            if self.dim is None:
+                return []
+            partition = self._partition(user_id, create=False)
+        if partition is None:
+            return []
+        return partition.search(query, k, exclude_ids)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": self.backend,
+                "persistent": bool(self.index_dir),
+                "loaded_users": len(self._partitions),
+                "loaded_vectors": sum(p.matrix.shape[0] for p in self._partitions.values()),
+            }
@@ -0,0 +1,272 @@
+import base64
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class CacheBackend(ABC):
+    """캐시 저장소 인터페이스 (키 -> JSON 직렬화 가능한 딕셔너리)"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: float) -> None:
+        ...
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """TTL과 크기 제한이 있는 프로세스 내 LRU 캐시"""
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.time() + ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """여러 워커/재시작 간에 공유되는 SQLite 캐시"""
+
+    def __init__(self, db_path: str, max_entries: int = 10000):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is not None and self._conn_pid == os.getpid():
+            return self._conn
+        db_dir = os.path.dirname(self.db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS recommendations ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        conn.commit()
+        self._conn = conn
+        self._conn_pid = os.getpid()
+        return conn
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT value FROM recommendations WHERE key = ? AND expires_at >= ?",
+                (key, time.time()),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: float) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "INSERT OR REPLACE INTO recommendations (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), time.time() + ttl_seconds),
+            )
+            # 만료 항목 정리 후, 크기 제한을 넘으면 가장 먼저 만료될 항목부터 삭제
+            conn.execute("DELETE FROM recommendations WHERE expires_at < ?", (time.time(),))
+            conn.execute(
+                "DELETE FROM recommendations WHERE key IN ("
+                " SELECT key FROM recommendations ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            conn.commit()
+
+
+class RedisCacheBackend(CacheBackend):
+    """Redis(또는 로컬 Redis 호환 서버) 캐시. redis 패키지가 필요합니다."""
+
+    def __init__(self, url: str = "redis://localhost:6379/0", prefix: str = "dotodo:recommendation:"):
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError("Redis 캐시를 사용하려면 redis 패키지가 필요합니다: pip install redis") from e
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self.client.get(self.prefix + key)
+        return json.loads(value) if value else None
+
+    def set(self, key: str, value: Dict[str, Any], ttl_seconds: float) -> None:
+        # Redis는 0 이하의 만료 시간을 거부하므로 밀리초 단위로, 최소 1ms로 설정
+        self.client.psetex(
+            self.prefix + key, max(1, int(ttl_seconds * 1000)), json.dumps(value, ensure_ascii=False)
+        )
+
+
+class RecommendationCache:
+    def __init__(
+        self,
+        backend: CacheBackend,
+        ttl_seconds: float = 3600,
+        embed_fn: Optional[Callable[[List[str]], Any]] = None,
+        similarity_threshold: float = 0.97,
+        max_similar_entries: int = 16,
+    ):
+        """
+        압축된 프롬프트 입력(p_data, h_data) 기준의 LLM 결과 캐시.
+
+        Args:
+            backend (CacheBackend): 결과를 저장할 백엔드.
+            ttl_seconds (float): 캐시 유지 시간(초).
+            embed_fn (Optional[Callable]): 텍스트 목록 -> (N, dim) 정규화 임베딩 함수.
+                설정하면 정확히 같은 입력이 없을 때, 같은 범위(사용자 + 오늘 일정) 안에서
+                완료 기록의 할 일 임베딩 평균이 임계값 이상으로 비슷한 최근 결과를 재사용합니다.
+            similarity_threshold (float): 유사도 모드의 재사용 임계값 (기록 프로필 코사인 유사도).
+            max_similar_entries (int): 범위별로 보관하는 유사도 비교용 최근 항목 수.
+                기록 프로필은 결과와 같은 백엔드에 범위별로 저장하므로 SQLite/Redis를 쓰면 워커 간에 공유됩니다.
+        """
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.embed_fn = embed_fn
+        self.similarity_threshold = similarity_threshold
+        self.max_similar_entries = max_similar_entries
+
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(chain_inputs: Dict[str, str]) -> str:
+        """_compress_past_data/_compress_today_data 결과의 해시"""
+        payload = chain_inputs["p_data"] + "\x00" + chain_inputs["h_data"]
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def make_scope(user_id: str, chain_inputs: Dict[str, str]) -> str:
+        """유사도 재사용 범위: 같은 사용자의 같은 오늘 일정끼리만 비교"""
+        payload = f"{user_id}\x00{chain_inputs['h_data']}"
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _profile(self, history_texts: List[str]) -> Optional[np.ndarray]:
+        """완료 기록의 (고유) 할 일 텍스트를 각각 임베딩해 평균낸 정규화 벡터"""
+        texts = list(dict.fromkeys(history_texts))
+        if not texts:
+            return None
+        profile = np.asarray(self.embed_fn(texts), dtype=np.float32).mean(axis=0)
+        return profile / max(float(np.linalg.norm(profile)), 1e-12)
+
+    @staticmethod
+    def _profiles_key(scope: str) -> str:
+        """범위별 기록 프로필 목록을 저장하는 백엔드 키 (결과 키는 16진 해시라 겹치지 않음)"""
+        return f"profiles:{scope}"
+
+    def _load_profiles(self, scope: str) -> List[Dict[str, Any]]:
+        """범위에 저장된 만료되지 않은 {key, expires_at, profile(base64 float32)} 목록"""
+        record = self.backend.get(self._profiles_key(scope)) or {}
+        now = time.time()
+        return [entry for entry in record.get("entries", []) if entry["expires_at"] >= now]
+
+    def _similarity_enabled(self, scope: Optional[str], history_texts: Optional[List[str]]) -> bool:
+        return self.embed_fn is not None and scope is not None and bool(history_texts)
+
+    def get(
+        self,
+        chain_inputs: Dict[str, str],
+        scope: Optional[str] = None,
+        history_texts: Optional[List[str]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Args:
+            chain_inputs (Dict[str, str]): 압축된 체인 입력 (정확히 일치하는 키 조회용).
+            scope (Optional[str]): make_scope 결과. 유사도 조회는 같은 범위 안에서만 합니다.
+            history_texts (Optional[List[str]]): 완료 기록의 할 일 텍스트 (유사도 프로필 계산용).
+        """
+        key = self.make_key(chain_inputs)
+        value = self.backend.get(key)
+        if value is not None:
+            with self._lock:
+                self.hits += 1
+            return value
+
+        if self._similarity_enabled(scope, history_texts):
+            similar_key = self._find_similar(scope, self._profile(history_texts))
+            if similar_key is not None:
+                value = self.backend.get(similar_key)
+                if value is not None:
+                    with self._lock:
+                        self.similar_hits += 1
+                    return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _find_similar(self, scope: str, profile: np.ndarray) -> Optional[str]:
+        entries = self._load_profiles(scope)
+        if not entries:
+            return None
+
+        vectors = np.stack([np.frombuffer(base64.b64decode(entry["profile"]), dtype="<f4") for entry in entries])
+        scores = vectors @ profile
+        best = int(scores.argmax())
+        return entries[best]["key"] if scores[best] >= self.similarity_threshold else None
+
+    def set(
+        self,
+        chain_inputs: Dict[str, str],
+        value: Dict[str, Any],
+        scope: Optional[str] = None,
+        history_texts: Optional[List[str]] = None,
+    ) -> None:
+        key = self.make_key(chain_inputs)
+        self.backend.set(key, value, self.ttl_seconds)
+
+        if self._similarity_enabled(scope, history_texts):
+            profile = self._profile(history_texts)
+            entry = {
+                "key": key,
+                "expires_at": time.time() + self.ttl_seconds,
+                "profile": base64.b64encode(profile.astype("<f4").tobytes()).decode("ascii"),
+            }
+            # 읽고-고쳐-쓰기이므로 다른 워커와 동시에 쓰면 한쪽 프로필이 빠질 수 있음 (정확히 같은 입력 조회에는 영향 없음)
+            with self._lock:
+                entries = [e for e in self._load_profiles(scope) if e["key"] != key] + [entry]
+                self.backend.set(
+                    self._profiles_key(scope), {"entries": entries[-self.max_similar_entries:]}, self.ttl_seconds
+                )
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.similar_hits + self.misses
+            return {
+                "backend": type(self.backend).__name__,
+                "hits": self.hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.misses,
+                "hit_rate": ((self.hits + self.similar_hits) / lookups) if lookups else 0.0,
+            }
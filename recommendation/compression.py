@@ -0,0 +1,93 @@
+import json
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+
+def compress_history(
+    p_data: List,
+    embed_fn: Callable[[List[str]], Any],
+    similarity_threshold: float = 0.85,
+    half_life_days: float = 14.0,
+    max_chars: int = 600,
+) -> Dict[str, Any]:
+    """
+    사용자의 전체 완료 기록을 한 번에 임베딩하고, 코사인 유사도로 거의 같은 할 일을 묶어
+    빈도/최근성 가중치 순의 대표 할 일 목록으로 요약합니다.
+
+    Args:
+        p_data (List): PastData 목록 (날짜 오름차순).
+        embed_fn (Callable): 텍스트 목록 -> (N, dim) 정규화 임베딩 함수.
+        similarity_threshold (float): 이 값 이상이면 같은 할 일로 묶습니다.
+        half_life_days (float): 최근성 가중치의 반감기(일). 오래된 기록일수록 가중치가 작아집니다.
+        max_chars (int): 대표 할 일 목록의 총 글자 수 상한 (프롬프트 토큰 예산의 근사값).
+
+    Returns:
+        Dict[str, Any]: {"days": 기록 일수, "patterns": 카테고리별 완료 수, "representative_todos": [...]}
+    """
+    category_counts: Dict[str, int] = {}
+    texts: List[str] = []
+    index_of: Dict[str, int] = {}
+    categories: List[str] = []
+    counts: List[int] = []
+    weights: List[float] = []
+
+    total_days = len(p_data)
+    for day_index, day_data in enumerate(p_data):
+        recency = 0.5 ** ((total_days - 1 - day_index) / half_life_days)
+        for category, todos in day_data.completed_todos.root.items():
+            category_counts[category] = category_counts.get(category, 0) + len(todos)
+            for todo in todos:
+                i = index_of.get(todo.todo)
+                if i is None:
+                    i = index_of[todo.todo] = len(texts)
+                    texts.append(todo.todo)
+                    categories.append(category)
+                    counts.append(0)
+                    weights.append(0.0)
+                counts[i] += 1
+                weights[i] += recency
+
+    if not texts:
+        return {"days": total_days, "patterns": category_counts, "representative_todos": []}
+
+    # 고유 할 일 전체를 한 번의 배치로 임베딩
+    vectors = np.asarray(embed_fn(texts), dtype=np.float32)
+
+    # 가중치가 큰 할 일부터 대표로 삼고, 대표와 유사한 할 일은 그 묶음에 합산.
+    # 각 할 일은 지금까지 고른 대표(R개)와만 비교하므로 (U, U) 행렬 없이 O(U·R) 비교로 끝남
+    weights_array = np.asarray(weights)
+    order = np.argsort(-weights_array, kind="stable")
+    representatives: List[int] = []
+    rep_vectors = np.empty_like(vectors)
+    cluster_count: Dict[int, int] = {}
+    cluster_weight: Dict[int, float] = {}
+    for i in order:
+        i = int(i)
+        if representatives:
+            rep_sims = rep_vectors[: len(representatives)] @ vectors[i]
+            best = int(rep_sims.argmax())
+            if rep_sims[best] >= similarity_threshold:
+                rep = representatives[best]
+                cluster_count[rep] += counts[i]
+                cluster_weight[rep] += weights[i]
+                continue
+        rep_vectors[len(representatives)] = vectors[i]
+        representatives.append(i)
+        cluster_count[i] = counts[i]
+        cluster_weight[i] = weights[i]
+
+    representative_todos = []
+    used_chars = 0
+    for rep in sorted(representatives, key=lambda r: -cluster_weight[r]):
+        entry = f"{categories[rep]}: {texts[rep]} x{cluster_count[rep]}"
+        if used_chars + len(entry) > max_chars:
+            break
+        representative_todos.append(entry)
+        used_chars += len(entry)
+
+    return {"days": total_days, "patterns": category_counts, "representative_todos": representative_todos}
+
+
+def compress_history_json(p_data: List, embed_fn: Callable[[List[str]], Any], **kwargs) -> str:
+    return json.dumps(compress_history(p_data, embed_fn, **kwargs), ensure_ascii=False, indent=1)
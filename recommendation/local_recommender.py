@@ -0,0 +1,140 @@
+import math
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+
+class LocalTodoRecommender:
+    def __init__(
+        self,
+        embedder,
+        matcher,
+        top_k: int = 3,
+        duplicate_threshold: float = 0.85,
+        frequency_weight: float = 1.0,
+        recency_weight: float = 0.7,
+        gap_weight: float = 0.8,
+    ):
+        """
+        LLM 없이 임베딩만으로 추천하는 로컬 추천기. OpenAI가 느리거나 실패할 때의 대체 경로,
+        또는 지연 시간이 중요한 기본 경로로 사용합니다.
+
+        후보는 사용자의 완료 기록(p_data)과 ToDoMatcher의 카테고리 대표 문구에서 가져오며,
+        빈도/최근성/오늘 일정에 없는 카테고리(gap) 점수로 순위를 매기고 임베딩 유사도로 중복을 제거합니다.
+
+        Args:
+            embedder: TextEmbedder 인스턴스 (embed_batch 사용).
+            matcher: ToDoMatcher 인스턴스 (categories 프로토타입 문구 사용).
+            top_k (int): 추천 개수.
+            duplicate_threshold (float): 이 값 이상으로 유사하면 같은 할 일로 보고 제외합니다.
+        """
+        self.embedder = embedder
+        self.matcher = matcher
+        self.top_k = top_k
+        self.duplicate_threshold = duplicate_threshold
+        self.frequency_weight = frequency_weight
+        self.recency_weight = recency_weight
+        self.gap_weight = gap_weight
+
+    def _phrase_bank(self) -> List[Tuple[str, str]]:
+        """ 카테고리 프로토타입 문구를 (할 일, 카테고리) 후보로 펼칩니다. """
+        return [
+            (phrase, category)
+            for category, phrases in self.matcher.categories.items()
+            for phrase in phrases
+        ]
+
+    def _collect_history(self, p_data: List) -> Dict[str, Dict[str, Any]]:
+        """ 완료 기록에서 할 일별 카테고리, 완료 횟수, 마지막 완료 시점(며칠 전)을 모읍니다. """
+        history: Dict[str, Dict[str, Any]] = {}
+        total_days = len(p_data or [])
+        for day_index, day_data in enumerate(p_data or []):
+            days_ago = total_days - 1 - day_index
+            for category, todos in day_data.completed_todos.root.items():
+                for todo in todos:
+                    entry = history.setdefault(todo.todo, {"category": category, "count": 0, "days_ago": days_ago})
+                    entry["count"] += 1
+                    entry["days_ago"] = min(entry["days_ago"], days_ago)
+        return history
+
+    def recommend(self, p_data: List, h_data) -> Dict[str, Any]:
+        """
+        Returns:
+            Dict[str, Any]: LLM 결과와 같은 {"final_recommendations": [...], "reason": "..."} 형식.
+        """
+        history = self._collect_history(p_data)
+        scheduled = [
+            (todo.todo, category)
+            for category, todos in h_data.scheduled_todos.root.items()
+            for todo in todos
+        ]
+        scheduled_categories = {category for _, category in scheduled}
+
+        candidates: Dict[str, Dict[str, Any]] = {}
+        for todo, entry in history.items():
+            candidates[todo] = {"category": entry["category"], "count": entry["count"], "days_ago": entry["days_ago"]}
+        for todo, category in self._phrase_bank():
+            candidates.setdefault(todo, {"category": category, "count": 0, "days_ago": None})
+
+        candidate_texts = list(candidates.keys())
+        scheduled_texts = [todo for todo, _ in scheduled]
+        if not candidate_texts:
+            return {"final_recommendations": [], "reason": "추천할 할 일을 찾지 못했어요."}
+
+        # 후보와 오늘 일정을 한 번에 임베딩
+        embeddings = np.asarray(self.embedder.embed_batch(candidate_texts + scheduled_texts), dtype=np.float32)
+        candidate_vectors = embeddings[:len(candidate_texts)]
+        scheduled_vectors = embeddings[len(candidate_texts):]
+
+        max_count = max((c["count"] for c in candidates.values()), default=0)
+        scores = np.zeros(len(candidate_texts), dtype=np.float32)
+        for i, todo in enumerate(candidate_texts):
+            candidate = candidates[todo]
+            frequency = math.log1p(candidate["count"]) / math.log1p(max_count) if max_count else 0.0
+            recency = math.exp(-candidate["days_ago"] / 7) if candidate["days_ago"] is not None else 0.0
+            gap = 1.0 if candidate["category"] not in scheduled_categories else 0.0
+            scores[i] = self.frequency_weight * frequency + self.recency_weight * recency + self.gap_weight * gap
+
+        # 오늘 일정과 겹치는 후보 제외
+        if len(scheduled_vectors):
+            overlap = (candidate_vectors @ scheduled_vectors.T).max(axis=1)
+            scores[overlap >= self.duplicate_threshold] = -np.inf
+
+        # 1차: 카테고리별 최고 후보로 균형을 맞추고, 2차: 남은 자리를 점수순으로 채움 (유사 후보는 제외)
+        order = [int(i) for i in np.argsort(-scores, kind="stable") if np.isfinite(scores[i])]
+        selected: List[int] = []
+        for diverse in (True, False):
+            for i in order:
+                if len(selected) >= self.top_k:
+                    break
+                if i in selected:
+                    continue
+                category = candidates[candidate_texts[i]]["category"]
+                if diverse and any(candidates[candidate_texts[j]]["category"] == category for j in selected):
+                    continue
+                if selected and (candidate_vectors[selected] @ candidate_vectors[i]).max() >= self.duplicate_threshold:
+                    continue
+                selected.append(i)
+
+        recommendations = [
+            {"todo": candidate_texts[i], "category": candidates[candidate_texts[i]]["category"]} for i in selected
+        ]
+        return {
+            "final_recommendations": recommendations,
+            "reason": self._build_reason(recommendations, candidates, scheduled_categories),
+        }
+
+    @staticmethod
+    def _build_reason(
+        recommendations: List[Dict[str, str]], candidates: Dict[str, Dict[str, Any]], scheduled_categories
+    ) -> str:
+        sentences = []
+        for rec in recommendations:
+            candidate = candidates[rec["todo"]]
+            if candidate["count"] >= 2:
+                sentences.append(f"{rec['todo']}은(는) 최근 **꾸준히** 해 오신 일이라 오늘도 도움이 될 거예요.")
+            elif rec["category"] not in scheduled_categories:
+                sentences.append(f"{rec['todo']}은(는) 오늘 일정에 없는 **{rec['category']}** 시간을 채워 줄 거예요.")
+            else:
+                sentences.append(f"{rec['todo']}을(를) 하시면 하루의 **균형**이 좋아질 거예요.")
+        return " ".join(sentences) if sentences else "추천할 할 일을 찾지 못했어요."
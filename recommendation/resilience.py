@@ -0,0 +1,179 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict
+
+
+class CircuitOpenError(Exception):
+    """서킷 브레이커가 열려 있어 LLM 호출을 건너뛸 때 발생"""
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_rate_threshold: float = 0.5,
+        window_size: int = 20,
+        min_calls: int = 5,
+        open_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        최근 호출의 실패율이 임계값을 넘으면 일정 시간 동안 호출을 즉시 거부합니다.
+        open_seconds가 지나면 한 번의 시험 호출(half-open)을 허용하고, 성공하면 다시 닫힙니다.
+        시험 호출이 결과를 기록하지 못하고 사라져도(클라이언트 연결 종료 등) open_seconds가 지나면
+        다음 호출자에게 시험 호출을 다시 허용하므로, 서킷이 half-open에 묶이지 않습니다.
+
+        Args:
+            failure_rate_threshold (float): 서킷을 여는 실패율 (0~1).
+            window_size (int): 실패율을 계산하는 최근 호출 수.
+            min_calls (int): 실패율을 판단하기 위한 최소 호출 수.
+            open_seconds (float): 서킷이 열린 뒤 시험 호출을 허용하기까지의 시간(초). 시험 호출의 제한 시간이기도 합니다.
+            clock (Callable[[], float]): 단조 증가 시계 (테스트에서 교체).
+        """
+        self.failure_rate_threshold = failure_rate_threshold
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self._clock = clock
+
+        self._results = deque(maxlen=window_size)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._trial_started_at = 0.0
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def allow(self) -> bool:
+        """ 지금 호출해도 되는지 확인합니다. 거부되면 False. """
+        with self._lock:
+            now = self._clock()
+            if self._state == self.OPEN:
+                if now - self._opened_at < self.open_seconds:
+                    self.rejected += 1
+                    return False
+                self._state = self.HALF_OPEN
+                self._trial_in_flight = False
+
+            if self._state == self.HALF_OPEN:
+                # 진행 중인 시험 호출이 제한 시간 안이면 거부, 지났으면 버려진 것으로 보고 다시 허용
+                if self._trial_in_flight and now - self._trial_started_at < self.open_seconds:
+                    self.rejected += 1
+                    return False
+                self._trial_in_flight = True
+                self._trial_started_at = now
+            return True
+
+    def release(self):
+        """
+        allow()로 허용받은 호출이 성공/실패를 기록하지 못하고 끝났을 때(취소 등) 호출합니다.
+        half-open 시험 호출이었다면 다음 호출자가 바로 시험할 수 있도록 풀어 줍니다.
+        """
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._state = self.CLOSED
+                self._results.clear()
+            self._results.append(True)
+
+    def record_failure(self):
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._open()
+                return
+            self._results.append(False)
+            failures = self._results.count(False)
+            if len(self._results) >= self.min_calls and failures / len(self._results) >= self.failure_rate_threshold:
+                self._open()
+
+    def _open(self):
+        self._state = self.OPEN
+        self._opened_at = self._clock()
+        self._trial_in_flight = False
+        print("⚠️ LLM 서킷 브레이커 열림: 업스트림 오류율이 높아 호출을 일시 중단합니다.")
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "state": self._state,
+                "recent_calls": len(self._results),
+                "recent_failures": self._results.count(False),
+                "rejected": self.rejected,
+            }
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """같은 키의 동시 호출을 하나로 합쳐, 먼저 들어온 호출의 결과를 모두에게 돌려줍니다 (스레드용)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """SingleFlight의 asyncio 버전. 한 호출자가 취소되어도 공유 작업은 계속 진행됩니다."""
+
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self.coalesced = 0
+
+    async def do(self, key: str, coro_fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(coro_fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._tasks)
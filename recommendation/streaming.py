@@ -0,0 +1,91 @@
+import json
+from typing import Any, Dict, List, Optional
+
+
+class IncrementalRecommendationParser:
+    """
+    LLM이 스트리밍으로 내보내는 JSON을 조각 단위로 읽으며, "final_recommendations" 배열의
+    각 항목 객체가 닫히는 즉시 꺼냅니다. "reason"을 포함한 전체 JSON은 close()에서 파싱합니다.
+    (응답 앞뒤의 ```json 같은 군더더기는 무시)
+    """
+
+    ARRAY_KEY = "final_recommendations"
+
+    def __init__(self):
+        self.buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = -1
+        self._last_string: Optional[str] = None
+        self._array_depth: Optional[int] = None
+        self._item_start = -1
+        self._top_start = -1
+        self._top_end = -1
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """
+        새 텍스트 조각을 추가하고, 이번 조각으로 완성된 추천 항목들을 반환합니다.
+        """
+        self.buffer += chunk
+        completed = []
+        text = self.buffer
+
+        for i in range(self._pos, len(text)):
+            char = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    self._last_string = text[self._string_start + 1:i]
+                continue
+
+            if self._depth == 0:
+                # 최상위 객체가 시작되기 전(또는 끝난 뒤)의 텍스트는 무시
+                if char == "{" and self._top_end == -1:
+                    self._top_start = i
+                    self._depth = 1
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = i
+            elif char in "{[":
+                if char == "[" and self._depth == 1 and self._last_string == self.ARRAY_KEY:
+                    self._array_depth = self._depth + 1
+                elif char == "{" and self._array_depth is not None and self._depth == self._array_depth:
+                    self._item_start = i
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if char == "}" and self._item_start != -1 and self._depth == self._array_depth:
+                    try:
+                        completed.append(json.loads(text[self._item_start:i + 1]))
+                    except json.JSONDecodeError:
+                        pass
+                    self._item_start = -1
+                elif char == "]" and self._array_depth is not None and self._depth == self._array_depth - 1:
+                    self._array_depth = None
+                if self._depth == 0:
+                    self._top_end = i
+
+        self._pos = len(text)
+        return completed
+
+    def close(self) -> Dict[str, Any]:
+        """
+        스트림이 끝난 뒤 전체 JSON 객체를 파싱하여 반환합니다.
+
+        Raises:
+            ValueError: 완전한 JSON 객체를 찾지 못한 경우.
+        """
+        if self._top_start == -1 or self._top_end == -1:
+            raise ValueError("JSON 형식을 찾을 수 없습니다.")
+        try:
+            return json.loads(self.buffer[self._top_start:self._top_end + 1])
+        except json.JSONDecodeError as e:
+            raise ValueError(f"JSON 파싱 오류: {e}")
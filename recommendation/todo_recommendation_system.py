@@ -1,15 +1,24 @@
+import asyncio
 import json
 import re
 import os
+import threading
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
 
+import numpy as np
 from dotenv import load_dotenv
 from langchain.prompts import PromptTemplate
 from langchain_openai import ChatOpenAI
-from langchain_core.output_parsers import BaseOutputParser
+from langchain_core.output_parsers import BaseOutputParser, StrOutputParser
 from langchain_community.callbacks import get_openai_callback
 
+from .cache import RecommendationCache
+from .compression import compress_history_json
+from .local_recommender import LocalTodoRecommender
+from .resilience import AsyncSingleFlight, CircuitBreaker, CircuitOpenError, SingleFlight
+from .streaming import IncrementalRecommendationParser
+
 
 class JSONOutputParser(BaseOutputParser):
     """JSON 출력을 강제로 파싱하는 커스텀 파서"""
@@ -38,21 +47,70 @@ class JSONOutputParser(BaseOutputParser):
         return "응답은 반드시 유효한 JSON 형식으로만 주세요."
 
 
+# categories를 넘기지 않았을 때 프롬프트에 쓰는 기본 카테고리 (nlp_agent/categories.json과 같은 구성)
+DEFAULT_CATEGORIES = ["운동", "공부", "장보기", "업무", "일상"]
+
+
 class LangChainTodoRecommendationSystem:
-    def __init__(self):
-        load_dotenv()
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY가 .env 파일에 설정되지 않았습니다.")
-
-        # 최적화된 ChatOpenAI 설정
-        self.llm = ChatOpenAI(
-            openai_api_key=api_key,
-            model_name="gpt-4o-mini",
-            temperature=0.5,
-            max_tokens=600,
-            timeout=15,
-        )
+    def __init__(
+        self,
+        cache: Optional[RecommendationCache] = None,
+        local_recommender: Optional[LocalTodoRecommender] = None,
+        llm=None,
+        max_concurrent_llm_calls: int = 4,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        history_embed_fn=None,
+        duplicate_embed_fn=None,
+        duplicate_threshold: float = 0.85,
+        categories: Optional[List[str]] = None,
+    ):
+        """
+        Args:
+            cache (Optional[RecommendationCache]): 설정하면 압축된 입력이 같은(또는 유사한) 요청의 LLM 결과를 재사용합니다.
+            local_recommender (Optional[LocalTodoRecommender]): LLM 호출이 실패하면 사용할 로컬 추천기.
+                mode="local"로 호출하면 LLM 없이 바로 사용합니다.
+            llm: 체인에 사용할 LLM (Runnable). None이면 gpt-4o-mini ChatOpenAI를 생성합니다. 테스트에서는 스텁을 넣을 수 있습니다.
+            max_concurrent_llm_calls (int): 동시에 진행되는 LLM 호출 수 상한.
+            circuit_breaker (Optional[CircuitBreaker]): 업스트림 오류율이 높을 때 즉시 실패시키는 서킷 브레이커.
+            history_embed_fn: 텍스트 목록 -> (N, dim) 임베딩 함수. 설정하면 과거 기록 전체를 임베딩 기반으로
+                중복 제거/요약하여 프롬프트에 넣습니다 (없으면 최근 3일 기록만 사용).
+            duplicate_embed_fn: 텍스트 목록 -> (N, dim) 임베딩 함수. 설정하면 오늘 일정과 겹치는 추천을 걸러내고
+                LLM의 추가 후보나 로컬 추천기로 보충합니다.
+            duplicate_threshold (float): 이 값 이상으로 유사하면 같은 할 일로 보고 추천에서 제외합니다.
+            categories (Optional[List[str]]): 프롬프트에 허용 카테고리로 넣을 이름 목록.
+                매처와 어긋나지 않도록 ToDoMatcher.categories에서 넘기며, 매처의 대체 카테고리 '기타'는 항상 포함합니다.
+        """
+        self.cache = cache
+        self.local_recommender = local_recommender
+        self.history_embed_fn = history_embed_fn
+        self.duplicate_embed_fn = duplicate_embed_fn
+        self.duplicate_threshold = duplicate_threshold
+        self.categories = list(dict.fromkeys([*(categories or DEFAULT_CATEGORIES), "기타"]))
+
+        # 동일 입력의 동시 요청 병합, 동시 호출 수 제한, 서킷 브레이커
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.max_concurrent_llm_calls = max_concurrent_llm_calls
+        self._llm_flight = SingleFlight()
+        self._async_llm_flight = AsyncSingleFlight()
+        self._llm_semaphore = threading.BoundedSemaphore(max_concurrent_llm_calls)
+        self._async_llm_semaphore = asyncio.Semaphore(max_concurrent_llm_calls)
+
+        if llm is not None:
+            self.llm = llm
+        else:
+            load_dotenv()
+            api_key = os.getenv("OPENAI_API_KEY")
+            if not api_key:
+                raise ValueError("OPENAI_API_KEY가 .env 파일에 설정되지 않았습니다.")
+
+            # 최적화된 ChatOpenAI 설정
+            self.llm = ChatOpenAI(
+                openai_api_key=api_key,
+                model_name="gpt-4o-mini",
+                temperature=0.5,
+                max_tokens=600,
+                timeout=15,
+            )
 
         self.json_parser = JSONOutputParser()
         self._setup_prompt_templates()
@@ -64,10 +122,11 @@ class LangChainTodoRecommendationSystem:
         # 최적화된 단일 프롬프트 템플릿
         self.single_prompt_template = PromptTemplate(
             input_variables=["p_data", "h_data"],
+            partial_variables={"categories": ", ".join(self.categories)},
             template="""
 You are a todo recommendation expert. Analyze user data and provide 3 final recommendations in a single step.
 
-PAST WEEK COMPLETED TODOS:
+PAST COMPLETED TODOS (category counts and representative todos):
 {p_data}
 
 TODAY'S SCHEDULED TODOS:
@@ -78,9 +137,10 @@ ANALYSIS PROCESS (think through this but only output final result):
 2. Gap Identification: What's missing from today's schedule?
 3. Generate 10 candidate recommendations avoiding duplicates with today's todos
 4. Select best 3 considering: feasibility, balance, user patterns
+5. Keep the next best 3 candidates as extra_candidates (used as replacements)
 
 RULES:
-- Categories: 운동, 공부, 장보기, 업무, 일상, 기타
+- Categories: {categories}
 - NO overlap with today's scheduled todos
 - NO time/location details in parentheses
 - Korean reason with **keyword** emphasis and warm tone
@@ -92,6 +152,11 @@ OUTPUT ONLY THIS JSON:
         {{"todo": "할일명", "category": "카테고리"}}, 
         {{"todo": "할일명", "category": "카테고리"}}
     ],
+    "extra_candidates": [
+        {{"todo": "할일명", "category": "카테고리"}},
+        {{"todo": "할일명", "category": "카테고리"}},
+        {{"todo": "할일명", "category": "카테고리"}}
+    ],
     "reason": "할일1은 **키워드**로 도움이 될 거예요. 할일2는 **키워드** 때문에 좋을 것 같아요. 할일3을 하시면 **키워드**가 향상될 거예요."
 }}
 """,
@@ -100,6 +165,8 @@ OUTPUT ONLY THIS JSON:
     def _setup_chains(self):
         """체인 설정"""
         self.single_chain = self.single_prompt_template | self.llm | self.json_parser
+        # 스트리밍용: 텍스트 조각을 그대로 받아 IncrementalRecommendationParser로 파싱
+        self.stream_chain = self.single_prompt_template | self.llm | StrOutputParser()
 
     def _compress_past_data(self, p_data: List) -> str:
         """과거 데이터를 요약해서 프롬프트 크기 줄이기"""
@@ -111,6 +178,10 @@ OUTPUT ONLY THIS JSON:
                 indent=1,
             )
 
+        # 임베딩 함수가 있으면 전체 기록을 한 번에 임베딩해 유사 할 일을 묶고 빈도 가중 대표만 남김
+        if self.history_embed_fn is not None:
+            return compress_history_json(p_data, self.history_embed_fn)
+
         category_counts = {}
         recent_todos = []
 
@@ -192,12 +263,8 @@ OUTPUT ONLY THIS JSON:
 
         return final_output
 
-    def run_recommendation_process(
-        self, p_data: List[Dict], h_data: Dict
-    ) -> Dict[str, Any]:
-        """최적화된 단일 프롬프트 추천 프로세스"""
-        print("=== 최적화된 Todo 추천 시스템 시작 ===")
-
+    def _prepare_chain_inputs(self, p_data: List[Dict], h_data: Dict) -> Dict[str, str]:
+        """데이터 검증 및 압축 후 체인 입력 생성 (데이터가 유효하지 않으면 빈 딕셔너리)"""
         # 1. 데이터 로드 (파일 로딩 로직 제거)
         # NEW: p_data nullable
         if not h_data:
@@ -212,19 +279,22 @@ OUTPUT ONLY THIS JSON:
         p_data_compressed = self._compress_past_data(p_data)
         h_data_compressed = self._compress_today_data(h_data)
 
-        # 3. 단일 프롬프트 실행
-        print("\n2. 최적화된 추천 생성 중...")
-
-        try:
-            with get_openai_callback() as cb:
-                single_result = self.single_chain.invoke(
-                    {"p_data": p_data_compressed, "h_data": h_data_compressed}
-                )
-                print(f"✅ 추천 생성 완료 - 토큰 사용: {cb.total_tokens}")
-        except Exception as e:
-            print(f"❌ 추천 생성 오류: {e}")
-            return {}
+        return {"p_data": p_data_compressed, "h_data": h_data_compressed}
+
+    def _cache_context(self, p_data: List, h_data: Dict, chain_inputs: Dict[str, str]) -> Dict[str, Any]:
+        """추천 캐시의 유사도 조회 범위(사용자 + 오늘 일정)와 완료 기록 할 일 목록"""
+        return {
+            "scope": RecommendationCache.make_scope(h_data.user_id, chain_inputs),
+            "history_texts": [
+                todo.todo
+                for day_data in p_data or []
+                for todos in day_data.completed_todos.root.values()
+                for todo in todos
+            ],
+        }
 
+    def _finalize_result(self, single_result: Dict) -> Dict[str, Any]:
+        """LLM 결과 검증 후 최종 출력 생성"""
         # 4. 결과 처리
         if not single_result or "final_recommendations" not in single_result:
             print("❌ 추천 추출 실패")
@@ -242,3 +312,392 @@ OUTPUT ONLY THIS JSON:
 
         print("\n=== 최적화된 추천 시스템 완료 ===")
         return final_output
+
+    def _run_local(self, p_data: List[Dict], h_data: Dict) -> Dict[str, Any]:
+        """로컬 임베딩 추천기로 결과 생성 (설정되지 않았으면 빈 딕셔너리)"""
+        if self.local_recommender is None:
+            return {}
+        print("\n2. 로컬 추천 생성 중 (LLM 미사용)...")
+        return self._finalize_result(self.local_recommender.recommend(p_data, h_data))
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        return np.asarray(self.duplicate_embed_fn(texts), dtype=np.float32)
+
+    def _scheduled_vectors(self, h_data: Dict) -> Optional[np.ndarray]:
+        """오늘 일정 할 일 임베딩 (중복 제거가 꺼져 있거나 일정이 없으면 None)"""
+        if self.duplicate_embed_fn is None:
+            return None
+        texts = [todo.todo for todos in h_data.scheduled_todos.root.values() for todo in todos]
+        return self._embed(texts) if texts else None
+
+    @staticmethod
+    def _stack(vectors: List[Optional[np.ndarray]]) -> np.ndarray:
+        """중복 비교 기준 벡터들을 하나의 행렬로 쌓습니다 (None/빈 배열은 건너뛰고, 모두 비면 빈 행렬)."""
+        vectors = [np.atleast_2d(v) for v in vectors if v is not None and len(v)]
+        return np.vstack(vectors) if vectors else np.empty((0, 0), dtype=np.float32)
+
+    def _select_non_duplicates(self, vectors: np.ndarray, reference: np.ndarray, limit: int) -> List[int]:
+        """reference 및 이미 고른 항목과 겹치지 않는 항목을 순서대로 최대 limit개 고릅니다."""
+        selected: List[int] = []
+        for i in range(len(vectors)):
+            if len(selected) >= limit:
+                break
+            if len(reference) and (reference @ vectors[i]).max() >= self.duplicate_threshold:
+                continue
+            if selected and (vectors[selected] @ vectors[i]).max() >= self.duplicate_threshold:
+                continue
+            selected.append(i)
+        return selected
+
+    @staticmethod
+    def _valid_candidates(items: Any) -> List[Dict[str, Any]]:
+        return [item for item in items or [] if isinstance(item, dict) and item.get("todo")]
+
+    def _refill(
+        self,
+        reference: np.ndarray,
+        extras: List[Dict[str, Any]],
+        extra_vectors: Optional[np.ndarray],
+        needed: int,
+        p_data: List[Dict],
+        h_data: Dict,
+    ) -> List[Dict[str, Any]]:
+        """빠진 자리를 LLM의 추가 후보로, 부족하면 로컬 추천기 결과로 채웁니다 (LLM 재호출 없음)."""
+        if extras and extra_vectors is None:
+            extra_vectors = self._embed([item["todo"] for item in extras])
+        chosen = self._select_non_duplicates(extra_vectors, reference, needed) if extras else []
+        added = [extras[i] for i in chosen]
+        if chosen:
+            reference = self._stack([reference, extra_vectors[chosen]])
+
+        if len(added) < needed and self.local_recommender is not None:
+            local = self._valid_candidates(self.local_recommender.recommend(p_data, h_data).get("final_recommendations"))
+            if local:
+                local_vectors = self._embed([item["todo"] for item in local])
+                added += [local[i] for i in self._select_non_duplicates(local_vectors, reference, needed - len(added))]
+        return added
+
+    @staticmethod
+    def _rewrite_reason(reason: str, dropped: List[Dict[str, Any]], added: List[Dict[str, Any]]) -> str:
+        """빠진 추천을 언급하는 문장을 지우고, 보충된 추천에 대한 문장을 덧붙입니다."""
+        sentences = [
+            sentence
+            for sentence in re.split(r"(?<=[.!?])\s+", reason.strip())
+            if sentence and not any(item["todo"] in sentence for item in dropped)
+        ]
+        sentences += [
+            f"{item['todo']}은(는) 오늘 일정과 겹치지 않는 **{item.get('category', '기타')}** 할 일이라 함께 추천드려요."
+            for item in added
+        ]
+        return " ".join(sentences)
+
+    def _replace_recommendations(
+        self,
+        single_result: Dict[str, Any],
+        dropped: List[Dict[str, Any]],
+        recommendations: List[Dict[str, Any]],
+        added: List[Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        print(f"✅ 오늘 일정과 겹치는 추천 {len(dropped)}개 제외, {len(added)}개 보충")
+        return {
+            **single_result,
+            "final_recommendations": recommendations,
+            "reason": self._rewrite_reason(single_result.get("reason", ""), dropped, added),
+        }
+
+    def _suppress_duplicates(self, single_result: Dict[str, Any], p_data: List[Dict], h_data: Dict) -> Dict[str, Any]:
+        """
+        추천과 오늘 일정을 한 번의 배치로 임베딩하여, 일정과 겹치는(또는 서로 겹치는) 추천을 제외하고
+        추가 후보/로컬 추천기로 보충합니다.
+        """
+        if self.duplicate_embed_fn is None or not single_result:
+            return single_result
+        recs = self._valid_candidates(single_result.get("final_recommendations"))
+        extras = self._valid_candidates(single_result.get("extra_candidates"))
+        scheduled = [todo.todo for todos in h_data.scheduled_todos.root.values() for todo in todos]
+        if not recs:
+            return single_result
+
+        vectors = self._embed([item["todo"] for item in recs + extras] + scheduled)
+        n_recs, n_candidates = len(recs), len(recs) + len(extras)
+        scheduled_vectors = vectors[n_candidates:]
+
+        kept = self._select_non_duplicates(vectors[:n_recs], scheduled_vectors, n_recs)
+        if len(kept) == n_recs:
+            return single_result
+
+        reference = np.vstack([scheduled_vectors, vectors[kept]])
+        added = self._refill(reference, extras, vectors[n_recs:n_candidates], n_recs - len(kept), p_data, h_data)
+        dropped = [recs[i] for i in range(n_recs) if i not in kept]
+        return self._replace_recommendations(single_result, dropped, [recs[i] for i in kept] + added, added)
+
+    def _invoke_llm(self, chain_inputs: Dict[str, str]) -> Dict[str, Any]:
+        """서킷 브레이커와 동시 호출 제한을 거쳐 체인을 실행"""
+        if not self.circuit_breaker.allow():
+            raise CircuitOpenError("LLM 서킷 브레이커가 열려 있습니다.")
+        try:
+            with self._llm_semaphore:
+                with get_openai_callback() as cb:
+                    single_result = self.single_chain.invoke(chain_inputs)
+                    print(f"✅ 추천 생성 완료 - 토큰 사용: {cb.total_tokens}")
+        except Exception:
+            self.circuit_breaker.record_failure()
+            raise
+        except BaseException:
+            # 결과 없이 중단된 호출(인터럽트 등)은 실패로 세지 않고 시험 호출 자리만 반납
+            self.circuit_breaker.release()
+            raise
+        self.circuit_breaker.record_success()
+        return single_result
+
+    async def _ainvoke_llm(self, chain_inputs: Dict[str, str]) -> Dict[str, Any]:
+        """_invoke_llm의 비동기 버전"""
+        if not self.circuit_breaker.allow():
+            raise CircuitOpenError("LLM 서킷 브레이커가 열려 있습니다.")
+        try:
+            async with self._async_llm_semaphore:
+                with get_openai_callback() as cb:
+                    single_result = await self.single_chain.ainvoke(chain_inputs)
+                    print(f"✅ 추천 생성 완료 - 토큰 사용: {cb.total_tokens}")
+        except Exception:
+            self.circuit_breaker.record_failure()
+            raise
+        except BaseException:
+            # 취소(CancelledError)는 실패로 세지 않고 시험 호출 자리만 반납
+            self.circuit_breaker.release()
+            raise
+        self.circuit_breaker.record_success()
+        return single_result
+
+    def llm_metrics(self) -> Dict[str, Any]:
+        """LLM 호출 보호 장치(서킷 브레이커, 병합, 동시 호출 제한) 상태"""
+        return {
+            "circuit_breaker": self.circuit_breaker.metrics(),
+            "max_concurrent_llm_calls": self.max_concurrent_llm_calls,
+            "in_flight": self._llm_flight.in_flight + self._async_llm_flight.in_flight,
+            "coalesced": self._llm_flight.coalesced + self._async_llm_flight.coalesced,
+        }
+
+    def run_recommendation_process(
+        self, p_data: List[Dict], h_data: Dict, mode: str = "llm"
+    ) -> Dict[str, Any]:
+        """최적화된 단일 프롬프트 추천 프로세스 (mode="local"이면 로컬 추천기만 사용)"""
+        print("=== 최적화된 Todo 추천 시스템 시작 ===")
+
+        if mode == "local":
+            # 로컬 추천기는 프롬프트 입력을 쓰지 않으므로 기록 압축(임베딩)을 건너뜀
+            if not h_data:
+                print("❌ 데이터 로딩 실패: 입력 데이터가 유효하지 않습니다.")
+                return {}
+            return self._run_local(p_data, h_data)
+
+        chain_inputs = self._prepare_chain_inputs(p_data, h_data)
+        if not chain_inputs:
+            return {}
+
+        if self.cache is not None:
+            cache_context = self._cache_context(p_data, h_data, chain_inputs)
+            cached_result = self.cache.get(chain_inputs, **cache_context)
+            if cached_result is not None:
+                print("✅ 캐시된 추천 결과 사용")
+                # 중복 제거 임계값이 바뀌었을 수 있으므로 캐시된 결과에도 다시 적용
+                return self._finalize_result(self._suppress_duplicates(cached_result, p_data, h_data))
+
+        # 3. 단일 프롬프트 실행
+        print("\n2. 최적화된 추천 생성 중...")
+
+        try:
+            single_result = self._llm_flight.do(
+                RecommendationCache.make_key(chain_inputs), lambda: self._invoke_llm(chain_inputs)
+            )
+        except Exception as e:
+            print(f"❌ 추천 생성 오류: {e}")
+            return self._run_local(p_data, h_data)
+
+        if not single_result or "final_recommendations" not in single_result:
+            print("❌ 추천 추출 실패")
+            return self._run_local(p_data, h_data)
+
+        single_result = self._suppress_duplicates(single_result, p_data, h_data)
+        if self.cache is not None:
+            self.cache.set(chain_inputs, single_result, **cache_context)
+
+        return self._finalize_result(single_result)
+
+    async def arun_recommendation_process(
+        self, p_data: List[Dict], h_data: Dict, mode: str = "llm"
+    ) -> Dict[str, Any]:
+        """run_recommendation_process의 비동기 버전 (체인의 ainvoke 사용)"""
+        print("=== 최적화된 Todo 추천 시스템 시작 (async) ===")
+
+        if mode == "local":
+            # 로컬 추천기는 프롬프트 입력을 쓰지 않으므로 기록 압축(임베딩)을 건너뜀
+            if not h_data:
+                print("❌ 데이터 로딩 실패: 입력 데이터가 유효하지 않습니다.")
+                return {}
+            return await asyncio.to_thread(self._run_local, p_data, h_data)
+
+        # 기록 압축(임베딩 포함)이 이벤트 루프를 막지 않도록 스레드에서 실행
+        chain_inputs = await asyncio.to_thread(self._prepare_chain_inputs, p_data, h_data)
+        if not chain_inputs:
+            return {}
+
+        if self.cache is not None:
+            # 디스크 조회/임베딩 계산이 이벤트 루프를 막지 않도록 스레드에서 실행
+            cache_context = self._cache_context(p_data, h_data, chain_inputs)
+            cached_result = await asyncio.to_thread(self.cache.get, chain_inputs, **cache_context)
+            if cached_result is not None:
+                print("✅ 캐시된 추천 결과 사용")
+                cached_result = await asyncio.to_thread(self._suppress_duplicates, cached_result, p_data, h_data)
+                return self._finalize_result(cached_result)
+
+        # 3. 단일 프롬프트 실행
+        print("\n2. 최적화된 추천 생성 중...")
+
+        try:
+            single_result = await self._async_llm_flight.do(
+                RecommendationCache.make_key(chain_inputs), lambda: self._ainvoke_llm(chain_inputs)
+            )
+        except Exception as e:
+            print(f"❌ 추천 생성 오류: {e}")
+            return await asyncio.to_thread(self._run_local, p_data, h_data)
+
+        if not single_result or "final_recommendations" not in single_result:
+            print("❌ 추천 추출 실패")
+            return await asyncio.to_thread(self._run_local, p_data, h_data)
+
+        single_result = await asyncio.to_thread(self._suppress_duplicates, single_result, p_data, h_data)
+        if self.cache is not None:
+            await asyncio.to_thread(self.cache.set, chain_inputs, single_result, **cache_context)
+
+        return self._finalize_result(single_result)
+
+    async def astream_recommendations(
+        self, p_data: List[Dict], h_data: Dict
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        추천을 스트리밍으로 생성합니다. LLM 출력에서 각 추천 항목이 완성되는 즉시
+        ("recommendation", 항목)을, 마지막에 ("reason", 이유 문자열)을 내보냅니다.
+        LLM을 쓸 수 없거나, 항목을 하나도 내보내기 전에 실패하거나, 유효한 항목이 하나도 없으면
+        로컬 추천기 결과를 같은 순서로 내보냅니다.
+        """
+        chain_inputs = await asyncio.to_thread(self._prepare_chain_inputs, p_data, h_data)
+        if not chain_inputs:
+            yield "error", "입력 데이터가 유효하지 않습니다."
+            return
+
+        if self.cache is not None:
+            cache_context = self._cache_context(p_data, h_data, chain_inputs)
+            cached_result = await asyncio.to_thread(self.cache.get, chain_inputs, **cache_context)
+            if cached_result is not None:
+                cached_result = await asyncio.to_thread(self._suppress_duplicates, cached_result, p_data, h_data)
+                async for event in self._replay_result(cached_result):
+                    yield event
+                return
+
+        # 항목이 완성될 때마다 오늘 일정과 비교하기 위해 일정 임베딩을 먼저 계산
+        scheduled_vectors = await asyncio.to_thread(self._scheduled_vectors, h_data)
+        accepted: List[Dict[str, Any]] = []
+        accepted_vectors: List[np.ndarray] = []
+        dropped: List[Dict[str, Any]] = []
+        emitted = 0
+
+        # LLM 스트림은 별도 태스크가 읽어 큐로 넘김: 클라이언트에 yield하는 동안 LLM 세마포어를 붙잡지 않고,
+        # 클라이언트가 연결을 끊으면(aclose) 태스크를 취소해 서킷 브레이커 시험 호출 자리를 반납
+        queue: asyncio.Queue = asyncio.Queue()
+        producer = None
+        try:
+            if not self.circuit_breaker.allow():
+                raise CircuitOpenError("LLM 서킷 브레이커가 열려 있습니다.")
+            producer = asyncio.ensure_future(self._produce_stream(chain_inputs, queue))
+
+            while True:
+                kind, payload = await queue.get()
+                if kind == "error":
+                    raise payload
+                if kind == "done":
+                    single_result = payload
+                    break
+
+                rec = payload
+                if not isinstance(rec, dict) or not rec.get("todo"):
+                    continue
+                # 일정이 없어도 추천끼리의 중복은 _suppress_duplicates와 같게 걸러냄
+                if self.duplicate_embed_fn is not None:
+                    vector = (await asyncio.to_thread(self._embed, [rec["todo"]]))[0]
+                    reference = self._stack([scheduled_vectors, *accepted_vectors])
+                    if not self._select_non_duplicates(vector[None], reference, 1):
+                        dropped.append(rec)
+                        continue
+                    accepted_vectors.append(vector)
+                accepted.append(rec)
+                emitted += 1
+                yield "recommendation", self._format_recommendation(rec)
+
+            # 유효한 항목이 하나도 없으면 arun_recommendation_process처럼 로컬 추천기로 대체
+            if not accepted and not dropped:
+                raise ValueError("추천 항목을 추출하지 못했습니다.")
+        except Exception as e:
+            print(f"❌ 스트리밍 추천 생성 오류: {e}")
+            if emitted == 0 and self.local_recommender is not None:
+                local_result = await asyncio.to_thread(self.local_recommender.recommend, p_data, h_data)
+                async for event in self._replay_result(local_result):
+                    yield event
+            else:
+                yield "error", f"추천 생성 중 오류 발생: {e}"
+            return
+        finally:
+            if producer is not None and not producer.done():
+                producer.cancel()
+                await asyncio.wait([producer])
+            if producer is not None and producer.cancelled():
+                # 결과를 기록하지 못한 호출은 실패로 세지 않고 시험 호출 자리만 반납
+                self.circuit_breaker.release()
+
+        if dropped:
+            reference = self._stack([scheduled_vectors, *accepted_vectors])
+            added = await asyncio.to_thread(
+                self._refill,
+                reference,
+                self._valid_candidates(single_result.get("extra_candidates")),
+                None,
+                len(dropped),
+                p_data,
+                h_data,
+            )
+            for rec in added:
+                yield "recommendation", self._format_recommendation(rec)
+            single_result = self._replace_recommendations(single_result, dropped, accepted + added, added)
+
+        if self.cache is not None and "final_recommendations" in single_result:
+            await asyncio.to_thread(self.cache.set, chain_inputs, single_result, **cache_context)
+        yield "reason", single_result.get("reason", "추천 이유를 가져올 수 없습니다.")
+
+    async def _produce_stream(self, chain_inputs: Dict[str, str], queue: asyncio.Queue):
+        """
+        LLM 스트림을 읽어 완성된 추천 항목을 ("item", 항목)으로, 끝나면 ("done", 전체 결과) 또는
+        ("error", 예외)로 큐에 넣습니다. circuit_breaker.allow()가 허용된 뒤에 실행합니다.
+        """
+        parser = IncrementalRecommendationParser()
+        try:
+            async with self._async_llm_semaphore:
+                async for chunk in self.stream_chain.astream(chain_inputs):
+                    for rec in parser.feed(chunk):
+                        queue.put_nowait(("item", rec))
+            single_result = parser.close()
+        except Exception as e:
+            self.circuit_breaker.record_failure()
+            queue.put_nowait(("error", e))
+            return
+        self.circuit_breaker.record_success()
+        queue.put_nowait(("done", single_result))
+
+    @staticmethod
+    def _format_recommendation(rec: Dict[str, Any]) -> Dict[str, Any]:
+        """generate_final_output의 recommendations 항목과 같은 형식"""
+        return {"category": rec.get("category"), "todo": rec.get("todo"), "completed": False}
+
+    async def _replay_result(self, single_result: Dict[str, Any]) -> AsyncIterator[Tuple[str, Any]]:
+        for rec in single_result.get("final_recommendations", []):
+            yield "recommendation", self._format_recommendation(rec)
+        yield "reason", single_result.get("reason", "추천 이유를 가져올 수 없습니다.")
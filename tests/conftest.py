@@ -0,0 +1,179 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+
+class FakeNLPAgent:
+    """ 모델/MeCab 없이 app 모듈을 import하기 위한 NLPAgent 대역. 텍스트마다 할 일 하나를 돌려줍니다. """
+
+    def __init__(self, **kwargs):
+        import numpy as np
+        import torch
+
+        self._np = np
+        self.embedder = SimpleNamespace(
+            embed_batch=lambda texts, **kw: torch.zeros((len(texts), 4)),
+            load=lambda: None,
+        )
+        self.matcher = SimpleNamespace(categories={})
+        self.parser = SimpleNamespace(tagger_provider=SimpleNamespace(metrics=lambda: {}))
+        self.batcher = None
+
+    def embed_batch(self, texts):
+        return self.embedder.embed_batch(texts)
+
+    def process_texts(self, texts, embedding_as_list=True):
+        return [
+            [{
+                "todo": text,
+                "date": None,
+                "time": None,
+                "original_sentence": text,
+                "simplified_text": text,
+                "embedding": self._np.ones(4, dtype=self._np.float32) / 2,
+                "category": "기타",
+                "category_confidence": 0.0,
+            }]
+            for text in texts
+        ]
+
+
+@pytest.fixture(scope="session")
+def app_module():
+    """ NLPAgent를 대역으로 바꾼 뒤 app 모듈을 import합니다. """
+    for module in ("fastapi", "httpx", "numpy", "torch", "orjson", "langchain_openai"):
+        pytest.importorskip(module)
+
+    patcher = pytest.MonkeyPatch()
+    patcher.setenv("OPENAI_API_KEY", os.getenv("OPENAI_API_KEY", "test-key"))
+    patcher.setenv("EMBED_CACHE_PATH", "")
+    patcher.setenv("EMBED_BATCHING", "0")
+    patcher.setenv("TODO_INDEX", "")
+
+    import nlp_agent.nlp_agent as nlp_agent_module
+    patcher.setattr(nlp_agent_module, "NLPAgent", FakeNLPAgent)
+
+    import app
+    yield app
+    patcher.undo()
+
+
+LLM_RESPONSE = (
+    '{"final_recommendations": ['
+    '{"todo": "산책하기", "category": "운동"}, '
+    '{"todo": "영어 단어 외우기", "category": "공부"}, '
+    '{"todo": "장보기", "category": "장보기"}], '
+    '"reason": "산책하기는 **건강**에 좋아요."}'
+)
+
+
+class StubLLM:
+    """
+    체인의 llm 자리에 넣는 스텁. 응답을 chunks개 조각으로 나누어 스트리밍하며,
+    호출 수와 최대 동시 실행 수를 기록합니다.
+    """
+
+    def __init__(
+        self,
+        response: str = LLM_RESPONSE,
+        delay: float = 0.0,
+        fail: bool = False,
+        chunks: int = 1,
+        chunk_delay: float = 0.0,
+    ):
+        self.response = response
+        self.delay = delay
+        self.fail = fail
+        self.chunks = chunks
+        self.chunk_delay = chunk_delay
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+
+    def _pieces(self):
+        size = max(1, -(-len(self.response) // self.chunks))
+        return [self.response[i:i + size] for i in range(0, len(self.response), size)]
+
+    def _start(self):
+        self.calls += 1
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+
+    def _transform(self, inputs):
+        import time
+
+        for _ in inputs:
+            pass
+        self._start()
+        try:
+            time.sleep(self.delay)
+            if self.fail:
+                raise RuntimeError("upstream error")
+            for piece in self._pieces():
+                yield piece
+                time.sleep(self.chunk_delay)
+        finally:
+            self.active -= 1
+
+    async def _atransform(self, inputs):
+        import asyncio
+
+        async for _ in inputs:
+            pass
+        self._start()
+        try:
+            await asyncio.sleep(self.delay)
+            if self.fail:
+                raise RuntimeError("upstream error")
+            for piece in self._pieces():
+                yield piece
+                await asyncio.sleep(self.chunk_delay)
+        finally:
+            self.active -= 1
+
+    def as_runnable(self):
+        from langchain_core.runnables import RunnableGenerator
+
+        return RunnableGenerator(self._transform, self._atransform)
+
+
+def make_h_data(user_id="user1", todos=("회의 참여",)):
+    return SimpleNamespace(
+        user_id=user_id,
+        date="2025-01-02",
+        scheduled_todos=SimpleNamespace(root={"업무": [SimpleNamespace(todo=t, completed=False) for t in todos]}),
+    )
+
+
+def make_p_data(todos=("헬스장 가기", "러닝"), user_id="user1"):
+    return [
+        SimpleNamespace(
+            user_id=user_id,
+            date="2025-01-01",
+            completed_todos=SimpleNamespace(root={"운동": [SimpleNamespace(todo=t, completed=True) for t in todos]}),
+        )
+    ]
+
+
+class StubLocalRecommender:
+    def __init__(self):
+        self.calls = 0
+
+    def recommend(self, p_data, h_data):
+        self.calls += 1
+        return {"final_recommendations": [{"todo": "스트레칭하기", "category": "운동"}], "reason": "로컬 추천이에요."}
+
+
+@pytest.fixture
+def make_system():
+    """ 스텁 LLM을 넣은 LangChainTodoRecommendationSystem 생성 함수 """
+    for module in ("numpy", "langchain", "langchain_core", "langchain_openai", "langchain_community"):
+        pytest.importorskip(module)
+    from recommendation.todo_recommendation_system import LangChainTodoRecommendationSystem
+
+    def factory(llm: StubLLM, **kwargs):
+        kwargs.setdefault("local_recommender", StubLocalRecommender())
+        return LangChainTodoRecommendationSystem(llm=llm.as_runnable(), **kwargs)
+
+    return factory
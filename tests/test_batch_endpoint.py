@@ -0,0 +1,96 @@
+
+def _ndjson_body(n):
+    import orjson
+
+    # 제너레이터 본문은 chunked 전송으로 여러 http.request 메시지에 나뉘어 도착
+    for i in range(n):
+        yield orjson.dumps({"user_id": f"user{i % 7}", "text": f"할 일 {i}"}) + b"\n"
+
+
+def test_large_chunked_ndjson_body_returns_one_line_per_item(app_module):
+    import orjson
+    from fastapi.testclient import TestClient
+
+    n = 3000
+    with TestClient(app_module.app) as client:
+        response = client.post(
+            "/process-text/batch?embedding_format=none",
+            content=_ndjson_body(n),
+            headers={"content-type": "application/x-ndjson"},
+        )
+
+    assert response.status_code == 200
+    lines = [orjson.loads(line) for line in response.content.splitlines()]
+    assert len(lines) == n
+    assert [line["index"] for line in lines] == list(range(n))
+    assert all(line["success"] for line in lines)
+
+
+def test_invalid_ndjson_line_is_reported_in_place(app_module):
+    import orjson
+    from fastapi.testclient import TestClient
+
+    body = b'{"user_id": "u", "text": "a"}\nnot json\n{"user_id": "u", "text": "b"}\n'
+    with TestClient(app_module.app) as client:
+        response = client.post("/process-text/batch", content=body, headers={"content-type": "application/x-ndjson"})
+
+    lines = [orjson.loads(line) for line in response.content.splitlines()]
+    assert [line["success"] for line in lines] == [True, False, True]
+
+
+def test_oversized_body_is_rejected(app_module, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(app_module, "BATCH_MAX_BODY_BYTES", 100)
+    with TestClient(app_module.app) as client:
+        response = client.post(
+            "/process-text/batch", content=_ndjson_body(50), headers={"content-type": "application/x-ndjson"}
+        )
+    assert response.status_code == 413
+
+
+def test_saturated_limiter_returns_503_before_streaming(app_module, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    limiter = app_module.nlp_limiter
+    monkeypatch.setattr(limiter, "_admitted", limiter.max_concurrent + limiter.max_queue)
+    with TestClient(app_module.app) as client:
+        response = client.post(
+            "/process-text/batch", content=_ndjson_body(3), headers={"content-type": "application/x-ndjson"}
+        )
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+
+def test_rejection_mid_stream_is_reported_per_item(app_module, monkeypatch):
+    import orjson
+    from fastapi import HTTPException
+    from fastapi.testclient import TestClient
+
+    class AdmitOnce:
+        """ 첫 청크만 받아들이고 이후에는 대기열 초과로 거절하는 limiter 대역 """
+
+        def __init__(self):
+            self.admitted = 0
+
+        async def __aenter__(self):
+            if self.admitted:
+                raise HTTPException(status_code=503, detail="NLP 요청이 많아 처리할 수 없습니다.")
+            self.admitted += 1
+
+        async def __aexit__(self, *exc):
+            pass
+
+    monkeypatch.setattr(app_module, "nlp_limiter", AdmitOnce())
+    monkeypatch.setattr(app_module, "BATCH_CHUNK_SIZE", 2)
+    with TestClient(app_module.app) as client:
+        response = client.post(
+            "/process-text/batch", content=_ndjson_body(5), headers={"content-type": "application/x-ndjson"}
+        )
+
+    assert response.status_code == 200
+    lines = [orjson.loads(line) for line in response.content.splitlines()]
+    assert [line["index"] for line in lines] == list(range(5))
+    assert [line["success"] for line in lines] == [True, True, False, False, False]
+    assert all("error" in line for line in lines[2:])
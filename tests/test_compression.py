@@ -0,0 +1,47 @@
+from types import SimpleNamespace
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from recommendation.compression import compress_history
+
+
+CONCEPTS = {"헬스장 가기": 0, "헬스 가기": 0, "영어 공부": 1, "장보기": 2}
+
+
+def fake_embed(texts):
+    """ 같은 개념의 텍스트는 같은 one-hot 벡터 """
+    return np.stack([np.eye(len(CONCEPTS), dtype=np.float32)[CONCEPTS[t]] for t in texts])
+
+
+def day(date, **todos_by_category):
+    return SimpleNamespace(
+        date=date,
+        completed_todos=SimpleNamespace(root={
+            category: [SimpleNamespace(todo=t, completed=True) for t in todos]
+            for category, todos in todos_by_category.items()
+        }),
+    )
+
+
+def test_similar_todos_are_merged_under_the_heaviest_representative():
+    p_data = [
+        day("2025-01-01", 운동=["헬스 가기"], 공부=["영어 공부"]),
+        day("2025-01-02", 운동=["헬스장 가기"], 장보기=["장보기"]),
+        day("2025-01-03", 운동=["헬스장 가기"]),
+    ]
+
+    summary = compress_history(p_data, fake_embed)
+
+    assert summary["days"] == 3
+    assert summary["patterns"] == {"운동": 3, "공부": 1, "장보기": 1}
+    assert summary["representative_todos"] == ["운동: 헬스장 가기 x3", "장보기: 장보기 x1", "공부: 영어 공부 x1"]
+
+
+def test_representatives_respect_the_character_budget():
+    p_data = [day("2025-01-01", 운동=["헬스장 가기"], 공부=["영어 공부"], 장보기=["장보기"])]
+
+    summary = compress_history(p_data, fake_embed, max_chars=len("운동: 헬스장 가기 x1") + 3)
+
+    assert summary["representative_todos"] == ["운동: 헬스장 가기 x1"]
@@ -0,0 +1,133 @@
+import asyncio
+import json
+
+import pytest
+
+from conftest import StubLLM, StubLocalRecommender, make_h_data, make_p_data
+
+np = pytest.importorskip("numpy")
+
+
+class FakeEmbedder:
+    """
+    같은 개념으로 묶은 텍스트는 같은 단위 벡터로, 나머지는 서로 직교하는 벡터로 임베딩하는 대역.
+    호출마다 받은 텍스트 목록을 기록합니다.
+    """
+
+    def __init__(self, same=(), dim=32):
+        self.dim = dim
+        self.concepts = {}
+        self.calls = []
+        for group in same:
+            index = len(set(self.concepts.values()))
+            for text in group:
+                self.concepts[text] = index
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            if text not in self.concepts:
+                self.concepts[text] = len(set(self.concepts.values()))
+            vectors[row, self.concepts[text]] = 1.0
+        return vectors
+
+
+def llm_response(todos, extras=(), reason=""):
+    return json.dumps({
+        "final_recommendations": [{"todo": todo, "category": "일상"} for todo in todos],
+        "extra_candidates": [{"todo": todo, "category": "공부"} for todo in extras],
+        "reason": reason,
+    }, ensure_ascii=False)
+
+
+async def collect(stream):
+    return [event async for event in stream]
+
+
+def todos_of(result):
+    return [rec["todo"] for rec in result["recommendations"]]
+
+
+def test_recommendation_matching_a_scheduled_todo_is_replaced_by_an_extra_candidate(make_system):
+    embedder = FakeEmbedder(same=[("장보기", "마트 장보기")])
+    llm = StubLLM(llm_response(
+        ["산책하기", "장보기"],
+        extras=["독서하기"],
+        reason="산책하기는 기분 전환에 좋아요. 장보기로 주말을 준비해요.",
+    ))
+    system = make_system(llm, duplicate_embed_fn=embedder)
+
+    result = system.run_recommendation_process(make_p_data(), make_h_data(todos=("마트 장보기",)))
+
+    assert todos_of(result) == ["산책하기", "독서하기"]
+    assert "장보기로" not in result["reason"]
+    assert result["reason"].startswith("산책하기는 기분 전환에 좋아요.")
+    assert "독서하기" in result["reason"]
+    # 추천, 추가 후보, 일정을 한 번의 배치로 임베딩
+    assert embedder.calls == [["산책하기", "장보기", "독서하기", "마트 장보기"]]
+
+
+def test_duplicates_among_recommendations_are_dropped_without_a_schedule(make_system):
+    embedder = FakeEmbedder(same=[("산책하기", "동네 산책")])
+    llm = StubLLM(llm_response(["산책하기", "동네 산책", "장보기"], extras=["독서하기"]))
+    system = make_system(llm, duplicate_embed_fn=embedder)
+
+    result = system.run_recommendation_process(make_p_data(), make_h_data(todos=()))
+
+    assert todos_of(result) == ["산책하기", "장보기", "독서하기"]
+
+
+def test_refill_falls_back_to_local_recommender_when_extras_are_duplicates(make_system):
+    embedder = FakeEmbedder(same=[("회의 참여", "회의 준비", "회의록 정리")])
+    local = StubLocalRecommender()
+    llm = StubLLM(llm_response(["산책하기", "회의 준비"], extras=["회의록 정리"]))
+    system = make_system(llm, duplicate_embed_fn=embedder, local_recommender=local)
+
+    result = system.run_recommendation_process(make_p_data(), make_h_data(todos=("회의 참여",)))
+
+    assert todos_of(result) == ["산책하기", "스트레칭하기"]
+    assert local.calls == 1
+
+
+def test_unique_recommendations_are_returned_unchanged(make_system):
+    llm = StubLLM(llm_response(["산책하기", "장보기"], reason="그대로예요."))
+    system = make_system(llm, duplicate_embed_fn=FakeEmbedder())
+
+    result = system.run_recommendation_process(make_p_data(), make_h_data())
+
+    assert todos_of(result) == ["산책하기", "장보기"]
+    assert result["reason"] == "그대로예요."
+
+
+def test_rewrite_reason_drops_sentences_about_removed_items(make_system):
+    system = make_system(StubLLM())
+
+    reason = system._rewrite_reason(
+        "산책하기는 좋아요! 장보기도 필요해요. 마무리예요?",
+        dropped=[{"todo": "장보기"}],
+        added=[{"todo": "독서하기", "category": "공부"}],
+    )
+
+    assert reason == (
+        "산책하기는 좋아요! 마무리예요? "
+        "독서하기은(는) 오늘 일정과 겹치지 않는 **공부** 할 일이라 함께 추천드려요."
+    )
+
+
+@pytest.mark.parametrize("scheduled", [(), ("마트 장보기",)])
+def test_streaming_and_sync_paths_suppress_the_same_duplicates(make_system, scheduled):
+    same = [("산책하기", "동네 산책"), ("장보기", "마트 장보기")]
+    response = llm_response(["산책하기", "동네 산책", "장보기"], extras=["독서하기", "요리하기"])
+    h_data = make_h_data(todos=scheduled)
+
+    sync_system = make_system(StubLLM(response), duplicate_embed_fn=FakeEmbedder(same=same))
+    sync_todos = todos_of(sync_system.run_recommendation_process(make_p_data(), h_data))
+
+    stream_system = make_system(StubLLM(response, chunks=10), duplicate_embed_fn=FakeEmbedder(same=same))
+    events = asyncio.run(collect(stream_system.astream_recommendations(make_p_data(), h_data)))
+    stream_todos = [data["todo"] for kind, data in events if kind == "recommendation"]
+
+    assert stream_todos == sync_todos
+    assert "동네 산책" not in stream_todos
+    assert events[-1][0] == "reason"
@@ -0,0 +1,87 @@
+import json
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("transformers")
+
+from nlp_agent.matcher import ToDoMatcher, load_category_config
+
+
+# 프로토타입 문구를 고정된 단위 벡터로 바꾸는 임베더 대역
+PROTOTYPE_VECTORS = {
+    "헬스장 가기": [1.0, 0.0, 0.0],
+    "러닝": [0.9, 0.1, 0.0],
+    "공부하기": [0.0, 1.0, 0.0],
+}
+
+
+class FakeEmbedder:
+    model_id = "fake"
+
+    def cache_variant(self, max_length=None):
+        return "fake:max_length=8"
+
+    def embed_batch(self, texts):
+        return torch.tensor([PROTOTYPE_VECTORS[text] for text in texts])
+
+
+def _write_config(tmp_path, **overrides):
+    config = {
+        "pooling": "max",
+        "temperature": 0.05,
+        "default_threshold": 0.6,
+        "categories": {
+            "운동": {"threshold": 0.8, "prototypes": ["헬스장 가기", "러닝"]},
+            "공부": ["공부하기"],
+        },
+    }
+    config.update(overrides)
+    path = tmp_path / "categories.json"
+    path.write_text(json.dumps(config, ensure_ascii=False), encoding="utf-8")
+    return str(path)
+
+
+def test_accepted_match_reports_softmax_confidence(tmp_path):
+    matcher = ToDoMatcher(FakeEmbedder(), categories_path=_write_config(tmp_path))
+
+    match = matcher.match_categories(torch.tensor([1.0, 0.05, 0.0]))[0]
+
+    assert match.category == "운동"
+    assert match.score == pytest.approx(0.9988, abs=1e-3)
+    assert 0.99 < match.confidence <= 1.0
+
+
+def test_score_below_category_threshold_falls_back_with_zero_confidence(tmp_path):
+    matcher = ToDoMatcher(FakeEmbedder(), categories_path=_write_config(tmp_path))
+
+    # 운동 점수(약 0.71)가 운동 임계값 0.8 미만이지만 softmax 확률은 거의 1
+    [rejected, accepted] = matcher.match_categories(torch.tensor([[1.0, 0.0, 1.0], [0.0, 1.0, 0.5]]))
+
+    assert rejected.category == "기타"
+    assert rejected.score == pytest.approx(0.7071, abs=1e-3)
+    assert rejected.confidence == 0.0
+    # 공부는 임계값이 없어 default_threshold 0.6을 사용
+    assert accepted.category == "공부"
+    assert accepted.confidence > 0.99
+
+
+def test_explicit_similarity_threshold_overrides_config_default(tmp_path):
+    path = _write_config(tmp_path)
+
+    assert ToDoMatcher(FakeEmbedder(), categories_path=path).similarity_threshold == 0.6
+    matcher = ToDoMatcher(FakeEmbedder(), similarity_threshold=0.95, categories_path=path)
+
+    assert matcher.similarity_threshold == 0.95
+    # 카테고리별 임계값(운동 0.8)은 그대로, 임계값이 없는 공부만 0.95
+    assert matcher.thresholds.tolist() == pytest.approx([0.8, 0.95])
+    assert matcher.match_categories(torch.tensor([0.0, 1.0, 0.5]))[0].category == "기타"
+
+    no_default = _write_config(tmp_path, default_threshold=None)
+    assert ToDoMatcher(FakeEmbedder(), categories_path=no_default).similarity_threshold == 0.5
+
+
+@pytest.mark.parametrize("temperature", [0, -0.1])
+def test_non_positive_temperature_is_rejected(tmp_path, temperature):
+    with pytest.raises(ValueError):
+        load_category_config(_write_config(tmp_path, temperature=temperature))
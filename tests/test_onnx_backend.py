@@ -0,0 +1,86 @@
+import json
+
+import pytest
+
+torch = pytest.importorskip("torch")
+onnx = pytest.importorskip("onnx")
+pytest.importorskip("onnxruntime")
+pytest.importorskip("transformers")
+
+from nlp_agent.onnx_backend import OnnxEncoder
+
+
+@pytest.fixture
+def tiny_model(tmp_path):
+    """ input_ids를 (batch, sequence, 1) float로 바꾸는 작은 ONNX 모델과 로컬 설정 디렉터리 """
+    from onnx import TensorProto, helper
+
+    graph = helper.make_graph(
+        [
+            helper.make_node("Cast", ["input_ids"], ["as_float"], to=TensorProto.FLOAT),
+            helper.make_node("Unsqueeze", ["as_float", "axes"], ["last_hidden_state"]),
+        ],
+        "tiny",
+        [helper.make_tensor_value_info("input_ids", TensorProto.INT64, ["batch", "sequence"])],
+        [helper.make_tensor_value_info("last_hidden_state", TensorProto.FLOAT, ["batch", "sequence", 1])],
+        initializer=[helper.make_tensor("axes", TensorProto.INT64, [1], [2])],
+    )
+    model_path = tmp_path / "tiny.onnx"
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 17)])
+    model.ir_version = 8  # 설치된 onnx가 더 새 IR 버전을 기본값으로 써도 onnxruntime이 읽을 수 있도록
+    onnx.save(model, str(model_path))
+
+    config_dir = tmp_path / "config"
+    config_dir.mkdir()
+    (config_dir / "config.json").write_text(json.dumps({"model_type": "bert", "hidden_size": 1}))
+    return str(model_path), str(config_dir)
+
+
+def test_session_is_created_lazily_with_current_thread_setting(tiny_model, monkeypatch):
+    encoder = OnnxEncoder(*tiny_model)
+    assert encoder._session is None
+
+    # gunicorn post_fork처럼 인코더 생성 이후에 스레드 수를 바꿔도 세션이 그 값을 따름
+    monkeypatch.setattr(torch, "get_num_threads", lambda: 3)
+    output = encoder(input_ids=torch.tensor([[1, 2]]), attention_mask=torch.ones(1, 2, dtype=torch.long))[0]
+
+    assert output.tolist() == [[[1.0], [2.0]]]
+    assert encoder.session.get_session_options().intra_op_num_threads == 3
+
+
+def test_session_is_recreated_in_a_forked_process(tiny_model, monkeypatch):
+    encoder = OnnxEncoder(*tiny_model, num_threads=1)
+    parent_session = encoder.session
+    assert encoder.session is parent_session
+
+    monkeypatch.setattr("os.getpid", lambda: encoder._session_pid + 1)
+    assert encoder.session is not parent_session
+
+
+def test_interrupted_quantization_leaves_no_model_file(tiny_model, tmp_path, monkeypatch):
+    import onnxruntime.quantization
+
+    from nlp_agent.onnx_backend import quantize_int8
+
+    def interrupted(model_input, model_output, **kwargs):
+        with open(model_output, "wb") as f:
+            f.write(b"truncated")
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(onnxruntime.quantization, "quantize_dynamic", interrupted)
+    output_path = tmp_path / "tiny-int8.onnx"
+    with pytest.raises(KeyboardInterrupt):
+        quantize_int8(tiny_model[0], str(output_path))
+
+    assert not output_path.exists()
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_quantized_model_is_written_in_place(tiny_model, tmp_path):
+    from nlp_agent.onnx_backend import quantize_int8
+
+    output_path = tmp_path / "tiny-int8.onnx"
+    assert quantize_int8(tiny_model[0], str(output_path)) == str(output_path)
+
+    onnx.checker.check_model(str(output_path))
+    assert not list(tmp_path.glob("*.tmp"))
@@ -0,0 +1,20 @@
+import sys
+
+
+def test_msgpack_without_package_is_rejected_before_processing(app_module, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    processed = []
+    monkeypatch.setattr(app_module.agent, "process_texts", lambda texts, **kwargs: processed.append(texts))
+    monkeypatch.setitem(sys.modules, "msgpack", None)  # import msgpack -> ImportError
+
+    with TestClient(app_module.app) as client:
+        response = client.post(
+            "/process-text",
+            json={"user_id": "u1", "text": "헬스장 가기"},
+            headers={"accept": "application/x-msgpack"},
+        )
+
+    assert response.status_code == 406
+    assert processed == []
+
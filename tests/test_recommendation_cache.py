@@ -0,0 +1,102 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from recommendation.cache import CacheBackend, InMemoryCacheBackend, RecommendationCache, SQLiteCacheBackend
+
+
+VOCAB = ["헬스장 가기", "러닝", "영어 공부", "장보기", "보고서 쓰기"]
+
+
+def fake_embed(texts):
+    """ 어휘 안의 텍스트마다 서로 직교하는 one-hot 벡터 """
+    return np.stack([np.eye(len(VOCAB), dtype=np.float32)[VOCAB.index(t)] for t in texts])
+
+
+def make_cache():
+    return RecommendationCache(InMemoryCacheBackend(), embed_fn=fake_embed, similarity_threshold=0.9)
+
+
+def inputs(p, h):
+    return {"p_data": p, "h_data": h}
+
+
+def test_similar_history_is_reused_within_same_scope():
+    cache = make_cache()
+    scope = RecommendationCache.make_scope("user1", inputs("p1", "today"))
+    cache.set(inputs("p1", "today"), {"final_recommendations": []}, scope=scope, history_texts=["헬스장 가기", "러닝"])
+
+    # 압축 결과(p_data)는 다르지만 완료한 할 일 구성이 같음
+    found = cache.get(inputs("p2", "today"), scope=scope, history_texts=["러닝", "헬스장 가기", "러닝"])
+    assert found == {"final_recommendations": []}
+    assert cache.stats()["similar_hits"] == 1
+
+
+def test_similarity_never_crosses_users_or_schedules():
+    cache = make_cache()
+    history = ["헬스장 가기", "러닝"]
+    cache.set(
+        inputs("p1", "today"), {"final_recommendations": []},
+        scope=RecommendationCache.make_scope("user1", inputs("p1", "today")), history_texts=history,
+    )
+
+    other_user = RecommendationCache.make_scope("user2", inputs("p2", "today"))
+    other_day = RecommendationCache.make_scope("user1", inputs("p2", "tomorrow"))
+    assert cache.get(inputs("p2", "today"), scope=other_user, history_texts=history) is None
+    assert cache.get(inputs("p2", "tomorrow"), scope=other_day, history_texts=history) is None
+
+
+def test_different_history_is_not_reused():
+    cache = make_cache()
+    scope = RecommendationCache.make_scope("user1", inputs("p1", "today"))
+    cache.set(inputs("p1", "today"), {"final_recommendations": []}, scope=scope, history_texts=["헬스장 가기"])
+    assert cache.get(inputs("p2", "today"), scope=scope, history_texts=["영어 공부", "보고서 쓰기"]) is None
+
+
+def test_similarity_profiles_are_shared_through_the_backend(tmp_path):
+    # 같은 SQLite 파일을 쓰는 두 워커: 한쪽이 저장한 결과를 다른 쪽이 유사도로 재사용
+    db_path = str(tmp_path / "recommendations.sqlite3")
+    writer = RecommendationCache(SQLiteCacheBackend(db_path), embed_fn=fake_embed, similarity_threshold=0.9)
+    reader = RecommendationCache(SQLiteCacheBackend(db_path), embed_fn=fake_embed, similarity_threshold=0.9)
+    scope = RecommendationCache.make_scope("user1", inputs("p1", "today"))
+
+    writer.set(inputs("p1", "today"), {"final_recommendations": []}, scope=scope, history_texts=["헬스장 가기"])
+
+    assert reader.get(inputs("p2", "today"), scope=scope, history_texts=["헬스장 가기"]) == {"final_recommendations": []}
+    assert reader.stats()["similar_hits"] == 1
+
+
+def test_profiles_per_scope_are_bounded():
+    cache = RecommendationCache(InMemoryCacheBackend(), embed_fn=fake_embed, max_similar_entries=2)
+    scope = RecommendationCache.make_scope("user1", inputs("p", "today"))
+    for i, text in enumerate(["헬스장 가기", "러닝", "영어 공부"]):
+        cache.set(inputs(f"p{i}", "today"), {"i": i}, scope=scope, history_texts=[text])
+
+    assert [entry["key"] for entry in cache._load_profiles(scope)] == [
+        RecommendationCache.make_key(inputs(f"p{i}", "today")) for i in (1, 2)
+    ]
+    assert cache.get(inputs("q", "today"), scope=scope, history_texts=["헬스장 가기"]) is None
+
+
+def test_cache_backend_is_abstract():
+    with pytest.raises(TypeError):
+        CacheBackend()
+
+
+def test_redis_backend_keeps_sub_second_ttl_positive():
+    pytest.importorskip("redis")
+    from recommendation.cache import RedisCacheBackend
+
+    class RecordingClient:
+        def __init__(self):
+            self.calls = []
+
+        def psetex(self, key, milliseconds, value):
+            self.calls.append((key, milliseconds))
+
+    backend = RedisCacheBackend()
+    backend.client = RecordingClient()
+    backend.set("a", {}, 0.25)
+    backend.set("b", {}, 0.0001)
+
+    assert backend.client.calls == [("dotodo:recommendation:a", 250), ("dotodo:recommendation:b", 1)]
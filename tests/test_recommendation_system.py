@@ -0,0 +1,78 @@
+import asyncio
+
+from recommendation.resilience import CircuitBreaker
+
+from conftest import StubLLM, make_h_data, make_p_data
+
+
+def test_concurrent_llm_calls_are_capped_by_semaphore(make_system):
+    llm = StubLLM(delay=0.05)
+    system = make_system(llm, max_concurrent_llm_calls=2)
+
+    async def scenario():
+        # 서로 다른 입력이라 병합되지 않음
+        return await asyncio.gather(*[
+            system.arun_recommendation_process(make_p_data(), make_h_data(todos=(f"회의 {i}",)))
+            for i in range(6)
+        ])
+
+    results = asyncio.run(scenario())
+    assert llm.calls == 6
+    assert llm.max_active == 2
+    assert all(len(result["recommendations"]) == 3 for result in results)
+
+
+def test_identical_concurrent_requests_share_one_llm_call(make_system):
+    llm = StubLLM(delay=0.05)
+    system = make_system(llm)
+
+    async def scenario():
+        return await asyncio.gather(*[
+            system.arun_recommendation_process(make_p_data(), make_h_data()) for _ in range(5)
+        ])
+
+    results = asyncio.run(scenario())
+    assert llm.calls == 1
+    assert all(result == results[0] for result in results)
+
+
+def test_open_breaker_skips_llm_and_uses_local_recommender(make_system):
+    llm = StubLLM(fail=True)
+    breaker = CircuitBreaker(failure_rate_threshold=0.5, min_calls=2, open_seconds=60)
+    system = make_system(llm, circuit_breaker=breaker)
+
+    for i in range(2):
+        result = system.run_recommendation_process(make_p_data(), make_h_data(todos=(f"회의 {i}",)))
+        assert result["recommendations"][0]["todo"] == "스트레칭하기"
+    assert breaker.metrics()["state"] == CircuitBreaker.OPEN
+
+    system.run_recommendation_process(make_p_data(), make_h_data(todos=("회의 2",)))
+    assert llm.calls == 2
+    assert system.local_recommender.calls == 3
+
+
+def test_local_mode_skips_history_compression(make_system):
+    embedded = []
+
+    def history_embed_fn(texts):
+        embedded.append(list(texts))
+        raise AssertionError("local mode must not compress history")
+
+    llm = StubLLM()
+    system = make_system(llm, history_embed_fn=history_embed_fn)
+
+    result = system.run_recommendation_process(make_p_data(), make_h_data(), mode="local")
+    assert result["recommendations"][0]["todo"] == "스트레칭하기"
+    result = asyncio.run(system.arun_recommendation_process(make_p_data(), make_h_data(), mode="local"))
+    assert result["recommendations"][0]["todo"] == "스트레칭하기"
+    assert embedded == []
+    assert llm.calls == 0
+
+
+def test_prompt_lists_categories_from_the_matcher_config(make_system):
+    system = make_system(StubLLM(), categories=["운동", "독서", "기타"])
+    prompt = system.single_prompt_template.format(p_data="{}", h_data="{}")
+    assert "- Categories: 운동, 독서, 기타\n" in prompt
+
+    default_prompt = make_system(StubLLM()).single_prompt_template.format(p_data="{}", h_data="{}")
+    assert "- Categories: 운동, 공부, 장보기, 업무, 일상, 기타\n" in default_prompt
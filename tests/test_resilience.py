@@ -0,0 +1,150 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from recommendation.resilience import AsyncSingleFlight, CircuitBreaker, SingleFlight
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def open_breaker(clock, open_seconds=30.0):
+    breaker = CircuitBreaker(failure_rate_threshold=0.5, window_size=4, min_calls=2, open_seconds=open_seconds, clock=clock)
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.metrics()["state"] == CircuitBreaker.OPEN
+    return breaker
+
+
+def test_breaker_opens_on_failure_rate_and_rejects_until_timeout():
+    clock = FakeClock()
+    breaker = open_breaker(clock)
+    assert not breaker.allow()
+    clock.now = 29.9
+    assert not breaker.allow()
+    assert breaker.metrics()["rejected"] == 2
+
+
+def test_breaker_stays_closed_below_min_calls():
+    breaker = CircuitBreaker(min_calls=5, clock=FakeClock())
+    for _ in range(4):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.metrics()["state"] == CircuitBreaker.CLOSED
+
+
+def test_half_open_allows_single_trial_and_success_closes():
+    clock = FakeClock()
+    breaker = open_breaker(clock)
+    clock.now = 30.0
+    assert breaker.allow()
+    assert not breaker.allow()  # 시험 호출은 하나만
+    breaker.record_success()
+    assert breaker.metrics()["state"] == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_half_open_failure_reopens():
+    clock = FakeClock()
+    breaker = open_breaker(clock)
+    clock.now = 30.0
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.metrics()["state"] == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_abandoned_trial_is_reclaimed_after_deadline():
+    clock = FakeClock()
+    breaker = open_breaker(clock)
+    clock.now = 30.0
+    assert breaker.allow()  # 시험 호출자가 결과를 기록하지 않고 사라짐
+    clock.now = 59.0
+    assert not breaker.allow()
+    clock.now = 60.0
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.metrics()["state"] == CircuitBreaker.CLOSED
+
+
+def test_released_trial_can_be_retried_immediately():
+    clock = FakeClock()
+    breaker = open_breaker(clock)
+    clock.now = 30.0
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.metrics()["state"] == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "result"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("key", work)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(flight.do("key", work))) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    while flight.coalesced < 3:
+        time.sleep(0.001)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join(5)
+
+    assert calls == [1]
+    assert results == ["result"] * 4
+    assert flight.in_flight == 0
+
+
+def test_single_flight_propagates_errors_and_forgets_key():
+    flight = SingleFlight()
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        flight.do("key", fail)
+    assert flight.do("key", lambda: "ok") == "ok"
+
+
+def test_async_single_flight_coalesces_and_survives_caller_cancel():
+    async def scenario():
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "result"
+
+        first = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(flight.do("key", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        assert await second == "result"
+        assert calls == [1]
+        assert flight.coalesced == 1
+        await asyncio.sleep(0)
+        assert flight.in_flight == 0
+
+    asyncio.run(scenario())
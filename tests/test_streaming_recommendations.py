@@ -0,0 +1,119 @@
+import asyncio
+
+from recommendation.resilience import CircuitBreaker
+
+from conftest import StubLLM, make_h_data, make_p_data
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+async def collect(stream):
+    return [event async for event in stream]
+
+
+def test_disconnect_during_half_open_trial_releases_the_breaker(make_system):
+    clock = FakeClock()
+    breaker = CircuitBreaker(min_calls=2, open_seconds=60, clock=clock)
+    for _ in range(2):
+        breaker.allow()
+        breaker.record_failure()
+    clock.now = 60.0  # 시험 호출 허용 시점
+
+    llm = StubLLM(chunks=20, chunk_delay=0.02)
+    system = make_system(llm, circuit_breaker=breaker)
+
+    async def scenario():
+        stream = system.astream_recommendations(make_p_data(), make_h_data())
+        kind, _ = await stream.__anext__()
+        assert kind == "recommendation"
+        await stream.aclose()
+
+    asyncio.run(scenario())
+    assert breaker.metrics()["state"] == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()  # 다음 호출자가 바로 시험 호출 가능
+
+
+def test_stream_with_no_valid_items_falls_back_to_local(make_system):
+    llm = StubLLM(response='{"final_recommendations": [], "reason": "없음"}')
+    system = make_system(llm)
+
+    events = asyncio.run(collect(system.astream_recommendations(make_p_data(), make_h_data())))
+    assert events == [
+        ("recommendation", {"category": "운동", "todo": "스트레칭하기", "completed": False}),
+        ("reason", "로컬 추천이에요."),
+    ]
+
+
+def test_slow_client_does_not_hold_the_llm_semaphore(make_system):
+    llm = StubLLM(chunks=10)
+    system = make_system(llm, max_concurrent_llm_calls=1)
+
+    async def scenario():
+        # 첫 번째 클라이언트는 항목 하나만 읽고 멈춤
+        paused = system.astream_recommendations(make_p_data(), make_h_data(todos=("회의 A",)))
+        await paused.__anext__()
+        # 두 번째 요청은 첫 번째 클라이언트가 읽기를 재개하지 않아도 끝나야 함
+        events = await asyncio.wait_for(
+            collect(system.astream_recommendations(make_p_data(), make_h_data(todos=("회의 B",)))), timeout=2
+        )
+        await paused.aclose()
+        return events
+
+    events = asyncio.run(scenario())
+    assert [kind for kind, _ in events] == ["recommendation"] * 3 + ["reason"]
+    assert llm.calls == 2
+
+
+class StubStreamingSystem:
+    async def astream_recommendations(self, p_data, h_data):
+        yield "recommendation", {"category": "운동", "todo": "산책하기", "completed": False}
+        yield "reason", "산책하기는 건강에 좋아요."
+
+
+def _recommendation_request(app_module):
+    return app_module.RecommendationRequest.model_validate({
+        "p_data": [],
+        "h_data": {"user_id": "user1", "date": "2025-01-02", "scheduled_todos": {}},
+    })
+
+
+def test_paused_sse_client_does_not_hold_the_limiter_slot(app_module, monkeypatch):
+    limiter = app_module.ConcurrencyLimiter("추천", max_concurrent=1, max_queue=0)
+    monkeypatch.setattr(app_module, "recommendation_limiter", limiter)
+    monkeypatch.setattr(app_module, "recommendation_system", StubStreamingSystem())
+
+    async def scenario():
+        response = await app_module.stream_recommendations_endpoint(_recommendation_request(app_module))
+        assert limiter.metrics()["admitted"] == 1
+        # 클라이언트가 아직 한 줄도 읽지 않았어도 생성이 끝나면 자리를 반납
+        for _ in range(10):
+            await asyncio.sleep(0)
+        assert limiter.metrics()["admitted"] == 0
+
+        body = [chunk async for chunk in response.body_iterator]
+        assert [chunk.split("\n")[0] for chunk in body] == ["event: recommendation", "event: reason", "event: done"]
+
+    asyncio.run(scenario())
+
+
+def test_saturated_limiter_rejects_sse_with_503(app_module, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    limiter = app_module.ConcurrencyLimiter("추천", max_concurrent=1, max_queue=0)
+    limiter._admitted = 1
+    monkeypatch.setattr(app_module, "recommendation_limiter", limiter)
+    monkeypatch.setattr(app_module, "recommendation_system", StubStreamingSystem())
+
+    with TestClient(app_module.app) as client:
+        response = client.post(
+            "/api/model/recommendations/stream",
+            json={"p_data": [], "h_data": {"user_id": "user1", "date": "2025-01-02", "scheduled_todos": {}}},
+        )
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
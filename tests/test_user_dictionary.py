@@ -0,0 +1,28 @@
+import pytest
+
+mecab = pytest.importorskip("mecab")
+pytest.importorskip("mecab_ko_dic")
+
+from nlp_agent.parser import Parser
+from nlp_agent.user_dictionary import ensure_user_dictionary
+
+
+def test_compiles_and_loads_user_dictionary(tmp_path, monkeypatch):
+    monkeypatch.delenv("MECAB_DICT_INDEX", raising=False)
+
+    dic_path = ensure_user_dictionary(["점메추"], str(tmp_path))
+
+    assert dic_path is not None and dic_path.endswith(".dic")
+    assert ("점메추", "NNG") in mecab.MeCab(user_dictionary_path=dic_path).pos("점메추 해줘")
+    # 같은 단어 목록이면 컴파일된 파일을 재사용
+    assert ensure_user_dictionary(["점메추"], str(tmp_path)) == dic_path
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_failed_compilation_keeps_words_for_runtime_correction(tmp_path, monkeypatch):
+    monkeypatch.setenv("MECAB_DICT_INDEX", str(tmp_path / "missing-mecab-dict-index"))
+
+    assert ensure_user_dictionary(["맛점각"], str(tmp_path)) is None
+
+    parser = Parser(special_words=["맛점각"])
+    assert ("맛점각", "NNG") in parser._pos_with_special_words("오늘 맛점각 잡기")
@@ -0,0 +1,138 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from nlp_agent.vector_index import TodoVectorIndex
+
+
+def _vectors(n, dim=8, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal((n, dim)).astype(np.float32)
+
+
+def _items(n, prefix="할 일"):
+    return [{"todo": f"{prefix} {i}"} for i in range(n)]
+
+
+def _exact_top(vectors, query, k):
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    return list(np.argsort(-(normalized @ (query / np.linalg.norm(query))))[:k])
+
+
+def test_flat_search_returns_exact_top_k_in_order():
+    index = TodoVectorIndex()
+    vectors = _vectors(50)
+    assert index.add("u1", vectors, _items(50)) == list(range(50))
+
+    query = vectors[7] + 0.01
+    results = index.search("u1", query, k=5)
+
+    assert [r.id for r in results] == _exact_top(vectors, query, 5)
+    assert results[0].item == {"todo": "할 일 7"}
+    assert all(a.score >= b.score for a, b in zip(results, results[1:]))
+
+
+def test_search_excludes_ids_and_isolates_users():
+    index = TodoVectorIndex()
+    vectors = _vectors(10)
+    ids = index.add("u1", vectors, _items(10))
+    index.add("u2", vectors[:3], _items(3, prefix="다른 사용자"))
+
+    results = index.search("u1", vectors[4], k=3, exclude_ids=[ids[4]])
+    assert ids[4] not in [r.id for r in results]
+    assert len(results) == 3
+    assert all(r.item["todo"].startswith("할 일") for r in results)
+    assert index.search("unknown", vectors[0]) == []
+
+
+def test_dimension_mismatch_is_rejected():
+    index = TodoVectorIndex()
+    index.add("u1", _vectors(2, dim=8), _items(2))
+    with pytest.raises(ValueError):
+        index.add("u1", _vectors(2, dim=4), _items(2))
+
+
+def test_ivf_search_probes_lists_after_training():
+    index = TodoVectorIndex(backend="ivf", n_lists=8, n_probe=8, min_train_size=64)
+    vectors = _vectors(200)
+    index.add("u1", vectors[:100], _items(100))
+    index.add("u1", vectors[100:], _items(100))
+
+    partition = index._partitions["u1"]
+    assert partition.search_backend.centroids is not None
+    assert len(partition.search_backend.assignments) == 200
+
+    # 모든 목록을 검사하면 전수 검색과 결과가 같아야 함
+    query = vectors[150]
+    assert [r.id for r in index.search("u1", query, k=5)] == _exact_top(vectors, query, 5)
+
+
+def test_persistent_partition_is_shared_between_instances(tmp_path):
+    writer = TodoVectorIndex(index_dir=str(tmp_path))
+    reader = TodoVectorIndex(index_dir=str(tmp_path))
+    vectors = _vectors(6)
+
+    writer.add("u1", vectors[:3], _items(3))
+    assert [r.id for r in reader.search("u1", vectors[1], k=1)] == [1]
+
+    # 다른 인스턴스가 추가한 행도 ID가 이어지고, 이미 열린 파티션이 refresh로 읽어 옴
+    assert reader.add("u1", vectors[3:], _items(3)[::-1]) == [3, 4, 5]
+    results = writer.search("u1", vectors[5], k=1)
+    assert results[0].id == 5
+    assert results[0].item == {"todo": "할 일 0"}
+
+    reopened = TodoVectorIndex(index_dir=str(tmp_path))
+    assert reopened.dim == 8
+    assert reopened.stats()["loaded_vectors"] == 0
+    assert len(reopened.search("u1", vectors[0], k=10)) == 6
+
+
+def test_search_endpoint_does_not_return_the_just_indexed_todo(app_module, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(app_module, "todo_index", TodoVectorIndex())
+    with TestClient(app_module.app) as client:
+        client.post("/process-text", json={"user_id": "u1", "text": "헬스장 가기", "index_todos": True})
+        processed = client.post("/process-text", json={"user_id": "u1", "text": "운동하기", "index_todos": True}).json()
+        index_id = processed["todos"][0]["index_id"]
+
+        results = client.post(
+            "/todos/search", json={"user_id": "u1", "text": "운동하기", "exclude_ids": [index_id]}
+        ).json()["results"]
+        assert [r["todo"] for r in results] == ["헬스장 가기"]
+
+        # index_todos 없이 처리한 할 일은 저장되지 않음
+        client.post("/process-text", json={"user_id": "u1", "text": "산책하기"})
+        results = client.post("/todos/search", json={"user_id": "u1", "text": "산책하기"}).json()["results"]
+        assert "산책하기" not in [r["todo"] for r in results]
+
+
+def test_busy_partition_does_not_block_other_users():
+    import threading
+
+    index = TodoVectorIndex()
+    vectors = _vectors(4)
+    index.add("u1", vectors[:2], _items(2))
+    index.add("u2", vectors[2:], _items(2))
+
+    # u1 파티션이 재학습 등으로 잠겨 있는 동안에도 u2 검색/추가는 진행
+    with index._partitions["u1"]._lock:
+        done = threading.Event()
+
+        def work():
+            index.search("u2", vectors[2], k=1)
+            index.add("u2", vectors[:1], _items(1))
+            done.set()
+
+        threading.Thread(target=work, daemon=True).start()
+        assert done.wait(timeout=5)
+
+
+@pytest.mark.parametrize("k", [0, -1, 101])
+def test_search_endpoint_validates_k(app_module, monkeypatch, k):
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(app_module, "todo_index", TodoVectorIndex())
+    with TestClient(app_module.app) as client:
+        response = client.post("/todos/search", json={"user_id": "u1", "text": "운동하기", "k": k})
+    assert response.status_code == 422